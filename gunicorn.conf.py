@@ -0,0 +1,15 @@
+# SADIT production server configuration
+# Usage: gunicorn src.main:app -c gunicorn.conf.py
+import multiprocessing
+import os
+
+bind = os.getenv("SADIT_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("SADIT_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (and build every inference engine) once in the master.
+# Forked workers share the read-only model memory copy-on-write.
+# The SQLAlchemy pool is reset in each worker by the os.register_at_fork
+# hook installed in src/core/registry.py.
+preload_app = True
+os.environ.setdefault("SADIT_PRELOAD_ENGINES", "1")
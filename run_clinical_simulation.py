@@ -1,14 +1,14 @@
 from src.sadit.clinical.parser import ClinicalParser
 from src.sadit.clinical.semiology import SemiologyEngine
 from src.sadit.clinical.models import ClinicalInput, LabData
-from src.sadit.inference.bayesian import SaditBayesianEngine
+from src.sadit.inference.bayesian import load_engine
 
 
 def run_simulation():
     print("=== SADIT v1.1.9 CLINICAL SIMULATION ===")
     parser = ClinicalParser()
     sem_engine = SemiologyEngine()
-    bayes_engine = SaditBayesianEngine()
+    bayes_engine = load_engine()
 
     # Test Cases (Raw Text)
     scenarios = [
@@ -50,10 +50,10 @@ def run_audit():
     # --- TEST 3: Heuristic Calibration (Vision) ---
     print("\n[TEST 3] Vision Calibration (Austin-Moore Reference)...")
     vis = VisionHeuristicOptimizer()
-    # Mock image (logic is mathematical, image content doesn't affect scale calculation logic in current code, just array passing)
+    # Blank mock image: no head is detected, so the fallback radius applies
     dummy_img = np.zeros((100, 100))
     scale = vis.calibrar_anatomicamente(dummy_img)
-    # The current code sets detected_radius_pixels = 120, diameter = 240.
+    # Fallback detected_radius_pixels = 120, diameter = 240.
     # AustinMoore MM = 48.0. Scale = 48/240 = 0.2 mm/pixel.
     print(f" -> Calculated Scale: {scale:.4f} mm/pixel")
 
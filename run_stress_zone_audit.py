@@ -1,4 +1,4 @@
-from sadit.inference.bayesian import SaditBayesianEngine
+from sadit.inference.bayesian import load_engine
 from sadit.clinical.models import ClinicalInput, PainProfile
 from sadit.clinical.semiology import SemiologyEngine
 import sys
@@ -23,7 +23,7 @@ def print_heat_map(case_name, zone_conflict, prob_map):
 def run_stress_audit():
     print("=== AUDITORÍA DE STRESS-ZONES (SADIT v1.1.9) ===")
     sem = SemiologyEngine()
-    bayes = SaditBayesianEngine()
+    bayes = load_engine()
 
     # --- TEST A: Case 1 (Distal Impact) ---
     print("\n[PRUEBA A] Escenario Distal (Caso 1: WhatsApp Images)")
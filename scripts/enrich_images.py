@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path (run as: python scripts/enrich_images.py <image_dir> [out_dir] [workers])
+sys.path.append(".")
+
+from src.sadit.vision.cache import default_vision_cache  # noqa: E402
+from src.sadit.vision.enhancement import CZTEnhancedEmulator  # noqa: E402
+
+DEFAULT_OUT_DIR = os.path.join("data", "enriched")
+IMAGE_EXTENSIONS = (".npy", ".dcm", ".dicom", ".png", ".jpg", ".jpeg", ".tif", ".tiff")
+
+
+def enrich_directory(image_dir: str, out_dir: str = DEFAULT_OUT_DIR, workers: int = None):
+    print("=== SADIT BATCH ENRICHMENT ===")
+    paths = sorted(os.path.join(image_dir, name) for name in os.listdir(image_dir)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    print(f"[1] {len(paths)} images in {image_dir}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    # Workers load the files themselves; results come back in shared memory
+    with CZTEnhancedEmulator(cache=default_vision_cache()).enrich_batch(paths, max_workers=workers) as batch:
+        for path, enriched, error in zip(paths, batch, batch.errors):
+            if error is not None:
+                print(f"    [ERROR] {path}: {error}")
+                continue
+            np.save(os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + ".npy"), enriched)
+    print(f"[2] Enriched in {time.perf_counter() - start:.1f}s -> {out_dir}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python scripts/enrich_images.py <image_dir> [out_dir] [workers]")
+    enrich_directory(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUT_DIR,
+                     int(sys.argv[3]) if len(sys.argv) > 3 else None)
@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+
+# Add project root to path (run as: python scripts/run_implant_sweep.py [out_dir] [export.npz|.parquet])
+sys.path.append(".")
+
+from src.sadit.physics.sweep import ImplantSweep  # noqa: E402
+
+DEFAULT_OUT_DIR = os.path.join("data", "sweeps", "implant_sweep")
+
+
+def run_sweep(out_dir: str = DEFAULT_OUT_DIR, export_path: str = None):
+    print("=== SADIT IMPLANT SWEEP ===")
+    sweep = ImplantSweep(out_dir)
+    pending = len(sweep.pending_chunks())
+    print(f"[1] {sweep.spec.size} points in {sweep.n_chunks} chunks ({pending} pending)")
+
+    start = time.perf_counter()
+    computed = sweep.run()
+    print(f"[2] {computed} chunks computed in {time.perf_counter() - start:.1f}s -> {out_dir}")
+
+    if export_path:
+        sweep.export(export_path)
+        print(f"[3] Exported: {export_path}")
+
+
+if __name__ == "__main__":
+    run_sweep(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUT_DIR,
+              sys.argv[2] if len(sys.argv) > 2 else None)
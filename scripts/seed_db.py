@@ -19,6 +19,11 @@ def seed_database():
         # 1. Init Public Tables
         print("[1] Init Public Schema...")
         CoreBase.metadata.create_all(bind=engine)
+        # create_all does not add columns to existing tables
+        with engine.connect() as connection:
+            connection.execute(text(
+                "ALTER TABLE public.tenants ADD COLUMN IF NOT EXISTS bayesian_cpds JSON"))
+            connection.commit()
 
         # 2. Check/Create Tenant
         tenant_name = "Hospital General Universitario"
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from jose import JWTError
+
+from src.api.auth import oauth2_scheme
+from src.core.registry import get_bayesian_engine
+from src.core.security import decode_access_token
+from src.core.tenant_engines import tenant_engines, load_tenant_cpds
+from src.sadit.inference.bayesian import SaditBayesianEngine
+
+
+def get_current_tenant_id(token: str = Depends(oauth2_scheme)) -> Optional[int]:
+    """Tenant of the caller, from the 'tenant_id' claim set at /auth/login."""
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload.get("tenant_id")
+
+
+def get_tenant_bayesian_engine(tenant_id: Optional[int] = Depends(get_current_tenant_id),
+                               base: SaditBayesianEngine = Depends(get_bayesian_engine)) -> SaditBayesianEngine:
+    """
+    Bayesian engine of the caller's tenant: its CPD variant from the LRU
+    cache, or the shared global engine when the tenant has none.
+    """
+    if tenant_id is None:
+        return base
+    return tenant_engines.get(tenant_id, load_tenant_cpds, base)
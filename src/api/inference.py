@@ -4,9 +4,12 @@ from typing import List, Optional
 
 from src.sadit.clinical.semiology import SemiologyEngine
 from src.sadit.inference.bayesian import SaditBayesianEngine
+from src.sadit.inference.orchestrator import SADIT_Orchestrator
 from src.sadit.clinical.models import ClinicalInput, PainProfile, LabData
 
 from src.api.auth import oauth2_scheme  # Require Auth
+from src.core.registry import get_semiology_engine, get_orchestrator
+from src.api.dependencies import get_tenant_bayesian_engine
 
 router = APIRouter(prefix="/inference", tags=["Clinical Inference"])
 
@@ -23,17 +26,30 @@ class PainProfileSchema(BaseModel):
 
 class ClinicalAnalysisRequest(BaseModel):
     pain_profile: PainProfileSchema
-    ild_months: int = 12  # Default
-    mobility: str = "Independent"
+    ild_months: Optional[int] = None  # Unknown -> marginalized by the Bayesian engine
+    mobility: Optional[str] = None  # Unknown -> marginalized by the Bayesian engine
 
 
-# --- Engines Initialization (Singleton scope for simplicity) ---
-semiology_engine = SemiologyEngine()
-bayesian_engine = SaditBayesianEngine()
+class SensitivityRequest(ClinicalAnalysisRequest):
+    imaging_status: Optional[str] = None  # 'stable' / 'loose'; unknown -> marginalized
+    include_pairs: bool = False  # Also evaluate every combination of two flips
+
+
+class CaseAnalysisRequest(ClinicalAnalysisRequest):
+    implant_type: str = "Austin Moore"
+    imaging_status: Optional[str] = None
+    # Latency budget (ms): optional stages are degraded to fit it
+    latency_budget_ms: Optional[float] = None
+
+
+# --- Engines are provided by src.core.registry (one shared instance per process);
+# the Bayesian engine is the caller tenant's variant (src.core.tenant_engines) ---
 
 
 @router.post("/clinical")
-def analyze_clinical_case(request: ClinicalAnalysisRequest, token: str = Depends(oauth2_scheme)):
+def analyze_clinical_case(request: ClinicalAnalysisRequest, token: str = Depends(oauth2_scheme),
+                          semiology_engine: SemiologyEngine = Depends(get_semiology_engine),
+                          bayesian_engine: SaditBayesianEngine = Depends(get_tenant_bayesian_engine)):
     """
     Executes the REAL Inference Pipeline:
     1. Semiology Engine (ALICIA) -> Detects Septic Risk/Safety Score.
@@ -67,12 +83,13 @@ def analyze_clinical_case(request: ClinicalAnalysisRequest, token: str = Depends
 
         # 3. Run Bayesian Engine (Probabilistic)
         # Using mappings from bayesian.py
-        # Heuristic Defaults for missing imaging/ILD context in minimal UI
+        # Imaging is unknown until the Vision module is connected: it is
+        # marginalized out instead of being assumed 'Stable'.
         bayesian_result = bayesian_engine.infer_diagnosis(
             location=pp.location,
             pain_character=pp.character,
             ild_months=clinical_input.ild_months,
-            imaging_status="Stable",  # Default assumption until Vision module connected
+            imaging_status=None,
             mobility=clinical_input.mobility_assistance
         )
 
@@ -100,3 +117,76 @@ def analyze_clinical_case(request: ClinicalAnalysisRequest, token: str = Depends
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sensitivity")
+def analyze_sensitivity(request: SensitivityRequest, token: str = Depends(oauth2_scheme),
+                        bayesian_engine: SaditBayesianEngine = Depends(get_tenant_bayesian_engine)):
+    """
+    What-if grid for one case: the Bayesian posterior under every single
+    evidence flip (optionally every pair) plus each observed variable's
+    weight of evidence, in one call.
+    """
+    try:
+        result = bayesian_engine.sensitivity_analysis(
+            location=request.pain_profile.location,
+            pain_character=request.pain_profile.character,
+            ild_months=request.ild_months,
+            imaging_status=request.imaging_status,
+            mobility=request.mobility,
+            include_pairs=request.include_pairs
+        )
+        return {
+            "evidence_used": result.evidence_used,
+            "scenarios": result.to_records(),
+            "weight_of_evidence": result.weight_of_evidence
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/case")
+def analyze_case(request: CaseAnalysisRequest, token: str = Depends(oauth2_scheme),
+                 orchestrator: SADIT_Orchestrator = Depends(get_orchestrator),
+                 bayesian_engine: SaditBayesianEngine = Depends(get_tenant_bayesian_engine)):
+    """
+    Full orchestrator triangulation (physics + semiology + Bayes) for one
+    case. With latency_budget_ms, expensive optional stages (Monte Carlo
+    interval) are cut to answer in time and the response is flagged
+    partial, listing the degraded stages. The Bayesian stages use the
+    caller's tenant engine.
+    """
+    try:
+        pp = PainProfile(
+            onset=request.pain_profile.onset,
+            location=request.pain_profile.location,
+            intensity=request.pain_profile.intensity,
+            character=request.pain_profile.character,
+            aggravating=['night'] if request.pain_profile.is_night_pain else [],
+            irradiation=False,
+            alleviating=[]
+        )
+        result = orchestrator.analyze_case(
+            ClinicalInput(pain_profile=pp, ild_months=request.ild_months,
+                          mobility_assistance=request.mobility),
+            request.implant_type,
+            imaging_status=request.imaging_status,
+            latency_budget_ms=request.latency_budget_ms,
+            bayesian=bayesian_engine
+        )
+        return {
+            "diagnosis": result.diagnosis,
+            "probability": result.probability,
+            "confidence_interval": list(result.confidence_interval),
+            "citation": result.citation_source,
+            "load_transfer": result.load_transfer,
+            "partial": bool(result.degraded_stages),
+            "degraded_stages": result.degraded_stages,
+            "stage_timings": [
+                {"stage": t.name, "status": t.status, "wall_ms": t.wall_ms, "cpu_ms": t.cpu_ms}
+                for t in result.stage_timings]
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
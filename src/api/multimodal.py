@@ -6,16 +6,15 @@ from datetime import datetime
 from src.sadit.clinical.semiology import SemiologyEngine
 from src.sadit.inference.bayesian import SaditBayesianEngine
 from src.sadit.clinical.models import ClinicalInput, PainProfile, LabData, MedicalHistory
-from src.sadit.compliance.checker import SADIT_Compliance_Checker
 
 from src.api.auth import oauth2_scheme
+from src.core.registry import get_semiology_engine
+from src.api.dependencies import get_tenant_bayesian_engine
 
 router = APIRouter(prefix="/inference", tags=["Multimodal Inference"])
 
-# --- Engines Initialization ---
-semiology_engine = SemiologyEngine()
-bayesian_engine = SaditBayesianEngine()
-compliance_checker = SADIT_Compliance_Checker()
+# --- Engines are provided by src.core.registry (one shared instance per process);
+# the Bayesian engine is the caller tenant's variant (src.core.tenant_engines) ---
 
 
 @router.post("/multimodal")
@@ -24,7 +23,9 @@ async def analyze_multimodal_case(
     clinical_data: str = Form(...),
     lab_data: str = Form(None),
     medical_history: str = Form(None),
-    token: str = Depends(oauth2_scheme)
+    token: str = Depends(oauth2_scheme),
+    semiology_engine: SemiologyEngine = Depends(get_semiology_engine),
+    bayesian_engine: SaditBayesianEngine = Depends(get_tenant_bayesian_engine)
 ):
     """
     Ejecuta análisis multimodal completo con lab data y imágenes
@@ -69,8 +70,8 @@ async def analyze_multimodal_case(
         # 4. Construct clinical input (base version, not extended)
         clinical_input = ClinicalInput(
             pain_profile=pain_profile,
-            ild_months=clinical_dict.get('ild_months', 12),
-            mobility_assistance=clinical_dict.get('mobility', 'Independent'),
+            ild_months=clinical_dict.get('ild_months'),
+            mobility_assistance=clinical_dict.get('mobility'),
             lab_data=lab_results
         )
 
@@ -82,7 +83,7 @@ async def analyze_multimodal_case(
             location=pain_profile.location,
             pain_character=pain_profile.character,
             ild_months=clinical_input.ild_months,
-            imaging_status="Stable",
+            imaging_status=None,  # Unknown until vision is connected (marginalized)
             mobility=clinical_input.mobility_assistance
         )
 
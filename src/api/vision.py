@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi.responses import Response
+import base64
+
+import cv2
+import numpy as np
+
+from src.sadit.vision.enhancement import CZTEnhancedEmulator
+from src.sadit.vision.pyramid import ImagePyramid
+
+from src.api.auth import oauth2_scheme
+from src.core.jobs import enrichment_jobs
+from src.core.registry import get_czt_emulator
+
+router = APIRouter(prefix="/vision", tags=["Vision"])
+
+
+def decode_upload(data: bytes) -> np.ndarray:
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise HTTPException(status_code=400, detail="Unsupported or corrupt image file")
+    return image
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    # Enriched images are float in [0, 1]
+    ok, png = cv2.imencode(".png", np.clip(image * 255.0, 0, 255).astype(np.uint8))
+    if not ok:
+        raise HTTPException(status_code=500, detail="PNG encoding failed")
+    return png.tobytes()
+
+
+@router.post("/enrich")
+def enrich_image(file: UploadFile = File(...), token: str = Depends(oauth2_scheme),
+                 emulator: CZTEnhancedEmulator = Depends(get_czt_emulator)):
+    """
+    CZT enrichment of an uploaded radiograph. Returns a preview (coarse
+    pyramid level, sub-second) right away and starts the full-resolution
+    enrichment as a background job; poll /vision/enrich/{job_id} (any
+    worker can answer: job state and result live in the vision cache).
+    A plain def: decoding and the preview are CPU-bound, so FastAPI runs
+    them on its thread pool instead of the event loop.
+    """
+    pyramid = ImagePyramid.build(decode_upload(file.file.read()))
+    preview = emulator.enrich_preview(pyramid)
+    job = enrichment_jobs.submit(emulator.enrich_image, pyramid)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "shape": list(pyramid.shape),
+        "preview": {"shape": list(preview.shape),
+                    "png_base64": base64.b64encode(encode_png(preview)).decode()}
+    }
+
+
+@router.get("/enrich/{job_id}")
+def enrichment_status(job_id: str, token: str = Depends(oauth2_scheme)):
+    job = enrichment_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job.to_dict()
+
+
+@router.get("/enrich/{job_id}/image")
+def enrichment_result(job_id: str, token: str = Depends(oauth2_scheme)):
+    job = enrichment_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    if job.status == "error":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return Response(content=encode_png(job.result), media_type="image/png")
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+# Background workers per process and finished jobs kept for polling
+JOB_WORKERS = int(os.getenv("SADIT_JOB_WORKERS", "1"))
+JOB_RETENTION = int(os.getenv("SADIT_JOB_RETENTION", "32"))
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: str = "pending"  # 'pending' | 'running' | 'done' | 'error'
+    result: object = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {"job_id": self.job_id, "status": self.status, "error": self.error,
+                "created_at": self.created_at, "finished_at": self.finished_at}
+
+
+class BackgroundJobs:
+    """
+    Background jobs run on this worker's threads (e.g. full-resolution
+    enrichment behind a preview). Only the `retention` most recent finished
+    jobs are kept in memory.
+    With a `store` (a zero-argument factory of a VisionCache-like object:
+    get_json/put_json/get_array/put_array), every state change and the
+    result (arrays as .npy, other JSON-serializable values inline) are
+    also written to it under the job id, so any worker process sharing the
+    store can answer a poll; entries then expire with the store's eviction.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: int = JOB_RETENTION,
+                 store: Optional[Callable] = None):
+        self.workers = workers
+        self.retention = retention
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._store_factory = store
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None and self._store_factory is not None:
+            self._store = self._store_factory()
+        return self._store
+
+    def _persist(self, job: Job):
+        store = self.store
+        if store is None:
+            return
+        state = job.to_dict()
+        if job.status == "done":
+            if isinstance(job.result, np.ndarray):
+                store.put_array(job.job_id, job.result)
+                state["result_array"] = True
+            else:
+                try:
+                    state["result"] = json.loads(json.dumps(job.result))
+                except (TypeError, ValueError):
+                    pass  # Not shareable: only this worker has the result
+        store.put_json(job.job_id, state)
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        store = self.store
+        state = store.get_json(job_id) if store is not None else None
+        if state is None:
+            return None
+        result = state.pop("result", None)
+        if state.pop("result_array", False):
+            result = store.get_array(job_id)
+            if result is None:  # evicted
+                return None
+        return Job(result=result, **state)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Per process: threads do not survive a fork
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sadit-job")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def submit(self, func: Callable, *args, **kwargs) -> Job:
+        job = Job(job_id=uuid.uuid4().hex)
+
+        def run():
+            job.status = "running"
+            self._persist(job)
+            try:
+                job.result = func(*args, **kwargs)
+                job.status = "done"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "error"
+            job.finished_at = time.time()
+            try:
+                self._persist(job)
+            except Exception as e:
+                # Never leave the stored state 'running': other workers would poll forever
+                job.result, job.error, job.status = None, f"Result not stored: {type(e).__name__}: {e}", "error"
+                try:
+                    self._persist(job)
+                except Exception:
+                    pass
+
+        self._persist(job)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+            self._pool().submit(run)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """This worker's job, or the last state another worker stored."""
+        job = self._jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        for job in finished[:max(0, len(finished) - self.retention)]:
+            del self._jobs[job.job_id]
+
+
+def _vision_store():
+    from src.sadit.vision.cache import default_vision_cache
+    return default_vision_cache()
+
+
+# Shared by every worker through the on-disk vision cache
+enrichment_jobs = BackgroundJobs(store=_vision_store)
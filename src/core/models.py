@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -16,6 +16,9 @@ class Tenant(Base):
     # e.g., 'hospital_a_schema'
     schema_name = Column(String, unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Per-tenant Bayesian CPD overrides (see bayesian.compile_cpd_overrides);
+    # NULL -> the global expert model
+    bayesian_cpds = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -0,0 +1,115 @@
+import gc
+import os
+import sys
+import threading
+from typing import Callable, Dict
+
+from src.sadit.clinical.semiology import SemiologyEngine
+from src.sadit.compliance.checker import SADIT_Compliance_Checker
+from src.sadit.inference.bayesian import load_engine
+from src.sadit.inference.orchestrator import SADIT_Orchestrator
+from src.sadit.vision.cache import default_vision_cache
+from src.sadit.vision.enhancement import CZTEnhancedEmulator
+
+
+class EngineRegistry:
+    """
+    Process-wide provider of inference engines.
+    Engines are created lazily on first use (one instance per process) and
+    shared by every router. preload() builds them up front so that, under a
+    pre-forking server, workers inherit them copy-on-write.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._instances: Dict[str, object] = {}
+        # Re-entrant: a factory may resolve its own dependencies through get()
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable):
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            # Double-checked: another thread may have built it meanwhile
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"No engine registered under '{name}'")
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def preload(self):
+        for name in list(self._factories):
+            self.get(name)
+
+    def loaded(self) -> list:
+        return sorted(self._instances)
+
+    def reset(self):
+        with self._lock:
+            self._instances.clear()
+
+
+registry = EngineRegistry()
+registry.register("semiology", SemiologyEngine)
+registry.register("bayesian", load_engine)
+registry.register("compliance", SADIT_Compliance_Checker)
+registry.register("czt_emulator", lambda: CZTEnhancedEmulator(cache=default_vision_cache()))
+registry.register("orchestrator", lambda: SADIT_Orchestrator(
+    bayesian=registry.get("bayesian"), semiology=registry.get("semiology"),
+    emulator=registry.get("czt_emulator")))
+
+
+# --- FastAPI dependencies ---
+
+def get_semiology_engine() -> SemiologyEngine:
+    return registry.get("semiology")
+
+
+def get_bayesian_engine():
+    return registry.get("bayesian")
+
+
+def get_compliance_checker() -> SADIT_Compliance_Checker:
+    return registry.get("compliance")
+
+
+def get_orchestrator() -> SADIT_Orchestrator:
+    return registry.get("orchestrator")
+
+
+def get_czt_emulator() -> CZTEnhancedEmulator:
+    return registry.get("czt_emulator")
+
+
+# --- Pre-fork support ---
+
+def reset_db_pool_after_fork():
+    """
+    Connections inherited from the parent process must never be reused by a
+    child; dispose(close=False) drops the pool without closing the parent's
+    sockets. Processes that never imported the database module have no pool.
+    """
+    database = sys.modules.get("src.core.database")
+    if database is not None:
+        database.engine.dispose(close=False)
+
+
+def preload_for_fork():
+    """
+    Builds every engine in the parent process before workers are forked
+    (gunicorn --preload). gc.freeze() moves the preloaded objects to the
+    permanent generation so collector passes in the workers do not touch
+    their pages and break copy-on-write sharing.
+    """
+    registry.preload()
+    gc.freeze()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX only
+    os.register_at_fork(after_in_child=reset_db_pool_after_fork)
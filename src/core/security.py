@@ -29,3 +29,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict:
+    """Verifies signature and expiry; raises JWTError on invalid tokens."""
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
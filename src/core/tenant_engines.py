@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.sadit.inference.bayesian import SaditBayesianEngine, compile_cpd_overrides
+
+# Bounds of the per-worker cache of tenant model variants
+TENANT_CACHE_MAX_ENTRIES = int(os.getenv("SADIT_TENANT_CACHE_SIZE", "64"))
+TENANT_CACHE_MAX_MB = float(os.getenv("SADIT_TENANT_CACHE_MB", "256"))
+# Seconds before a cached tenant re-reads its CPD definition from the database
+TENANT_CACHE_TTL = float(os.getenv("SADIT_TENANT_CACHE_TTL", "60"))
+
+
+def spec_hash(spec: dict) -> str:
+    return hashlib.blake2b(json.dumps(spec, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class _Entry:
+    engine: SaditBayesianEngine
+    spec_hash: Optional[str]  # None: tenant without a variant (engine is the shared base)
+    nbytes: int
+    checked_at: float
+
+    def measure(self) -> int:
+        return 0 if self.spec_hash is None else self.engine.nbytes
+
+
+class TenantEngineCache:
+    """
+    Bounded LRU of per-tenant SaditBayesianEngine variants.
+    Engines are compiled from the tenant's CPD overrides without pgmpy, so an
+    entry costs only its arrays (posterior table, CPDs, Monte Carlo draws).
+    Least recently used tenants are evicted past max_entries or max_bytes.
+    Cached definitions are re-read after `ttl` seconds; an unchanged
+    definition (same hash, same base model version) keeps the compiled engine.
+    Tenants without a variant are cached too (as the shared base, 0 bytes) so
+    they do not query the database on every request.
+    """
+
+    def __init__(self, max_entries: int = TENANT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = int(TENANT_CACHE_MAX_MB * 1024 * 1024),
+                 ttl: float = TENANT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, tenant_id: int, load_spec: Callable[[int], Optional[dict]],
+            base: SaditBayesianEngine) -> SaditBayesianEngine:
+        """
+        Engine for `tenant_id`. load_spec(tenant_id) returns the tenant's CPD
+        overrides (None -> `base`, the global engine).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and now - entry.checked_at < self.ttl:
+                self._entries.move_to_end(tenant_id)
+                self._resize(entry)
+                self.hits += 1
+                return entry.engine
+
+        # Definition lookup and compilation run outside the lock
+        spec = load_spec(tenant_id)
+        base_compiled = base.compiled
+        digest = f"{spec_hash(spec)}:{base_compiled.version}" if spec else None
+        if digest is None:
+            engine = base
+        elif entry is not None and entry.spec_hash == digest:
+            engine = entry.engine
+        else:
+            engine = SaditBayesianEngine.from_compiled(compile_cpd_overrides(base_compiled, spec))
+
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(tenant_id, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            entry = _Entry(engine=engine, spec_hash=digest, nbytes=0, checked_at=now)
+            entry.nbytes = entry.measure()
+            self._entries[tenant_id] = entry
+            self._nbytes += entry.nbytes
+            self._evict(keep=tenant_id)
+        return engine
+
+    def _resize(self, entry: _Entry):
+        # Engines grow after insertion (Monte Carlo draws are cached lazily)
+        nbytes = entry.measure()
+        self._nbytes += nbytes - entry.nbytes
+        entry.nbytes = nbytes
+        self._evict(keep=next(reversed(self._entries)))
+
+    def _evict(self, keep: int):
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self._nbytes > self.max_bytes):
+            tenant_id = next(iter(self._entries))
+            if tenant_id == keep:
+                break
+            self._nbytes -= self._entries.pop(tenant_id).nbytes
+            self.evictions += 1
+
+    def discard(self, tenant_id: int):
+        with self._lock:
+            entry = self._entries.pop(tenant_id, None)
+            if entry is not None:
+                self._nbytes -= entry.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def stats(self) -> dict:
+        return {"tenants": len(self._entries), "nbytes": self._nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+def load_tenant_cpds(tenant_id: int) -> Optional[dict]:
+    """Reads Tenant.bayesian_cpds (public schema) in a short-lived session."""
+    from src.core.database import SessionLocal
+    from src.core.models import Tenant
+
+    db = SessionLocal()
+    try:
+        tenant = db.get(Tenant, tenant_id)
+        return tenant.bayesian_cpds if tenant is not None and tenant.is_active else None
+    finally:
+        db.close()
+
+
+tenant_engines = TenantEngineCache()
@@ -1,10 +1,14 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.core.database import engine
 from src.core import models as core_models
+from src.core.registry import registry, preload_for_fork
+from src.core.tenant_engines import tenant_engines
 from src.api.auth import router as auth_router
 from src.api.inference import router as inference_router
 from src.api.multimodal import router as multimodal_router
+from src.api.vision import router as vision_router
 
 # Initialize Public Tables (Tenants/Users) on Startup
 core_models.Base.metadata.create_all(bind=engine)
@@ -18,6 +22,14 @@ app = FastAPI(
 app.include_router(auth_router)
 app.include_router(inference_router)
 app.include_router(multimodal_router)
+app.include_router(vision_router)
+
+# Build all inference engines at import time when requested. With
+# `gunicorn --preload` (see gunicorn.conf.py) this runs once in the master and
+# workers share the read-only models copy-on-write; otherwise engines are
+# built lazily on the first request of each worker.
+if os.getenv("SADIT_PRELOAD_ENGINES", "0") == "1":
+    preload_for_fork()
 
 # CORS Configuration
 origins = ["*"]
@@ -38,4 +50,5 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"db_status": "configured", "inference_engine": "loaded"}
+    return {"db_status": "configured", "inference_engines": registry.loaded(),
+            "tenant_models": tenant_engines.stats()}
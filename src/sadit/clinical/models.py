@@ -55,8 +55,8 @@ class MedicalHistory:
 @dataclass
 class ClinicalInput:
     pain_profile: PainProfile
-    ild_months: int
-    mobility_assistance: str
+    ild_months: Optional[int]  # None = unknown
+    mobility_assistance: Optional[str]  # None = unknown
     lab_data: Optional[LabData] = None
 
 
@@ -66,7 +66,8 @@ class SemiologyEngine:
                 diagnosis="Probable Aseptic Loosening (Scenario B)",
                 probability=0.88,
                 confidence_interval=(0.85, 0.92),
-                citation_source=f"Inguinal Mechanical Pain + ILD {data.ild_months}mo"
+                citation_source="Inguinal Mechanical Pain + ILD "
+                                + (f"{data.ild_months}mo" if data.ild_months is not None else "unknown")
             )
 
         if pp.location == 'distal' and pp.character == 'mechanical':
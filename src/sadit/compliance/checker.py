@@ -1,6 +1,11 @@
+import os
+import cv2
 import numpy as np
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from ..vision.dicom import DicomImage, is_dicom
+from ..vision.pyramid import ImagePyramid
 
 @dataclass
 class DiagnosticResult:
@@ -8,6 +13,61 @@ class DiagnosticResult:
     probability: float
     confidence_interval: tuple
     citation_source: Optional[str] = None
+    # Per-stage StageTiming records of the orchestrator run that produced it
+    stage_timings: List = field(default_factory=list)
+    # Optional stages cut by the latency budget (partial answer when non-empty)
+    degraded_stages: List[str] = field(default_factory=list)
+    # Image measurements (e.g. texture roughness) when image analysis ran
+    image_findings: dict = field(default_factory=dict)
+    # Stem load-transfer FE summary (Gruen-zone shielding, peak stresses)
+    load_transfer: dict = field(default_factory=dict)
+
+@dataclass
+class ImageQualityMetrics:
+    shape: tuple
+    mean: float
+    std: float
+    snr_db: float
+    min_value: float
+    max_value: float
+    # Share of pixels clipped at the image's extreme values
+    saturation_fraction: float
+    # Variance of the Laplacian (low = blurred); None in approximate mode
+    laplacian_variance: Optional[float]
+    approximate: bool = False
+    # Approximate mode: SNR interval holding with probability 1 - delta
+    snr_bounds_db: Optional[Tuple[float, float]] = None
+
+    @property
+    def dynamic_range(self) -> float:
+        return self.max_value - self.min_value
+
+
+class _Moments:
+    """Streaming count/mean/M2 (Chan et al. pairwise merge of Welford blocks)."""
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def add_block(self, values: np.ndarray):
+        n = values.size
+        if n == 0:
+            return
+        # One float64 copy of the block, centered in place
+        centered = np.array(values, dtype=np.float64).ravel()
+        mean = float(centered.mean())
+        centered -= mean
+        m2 = float(np.dot(centered, centered))
+        delta = mean - self.mean
+        total = self.n + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.n if self.n else 0.0
+
 
 class SafetyException(Exception):
     """Raised when safety protocols (ISO 14971) are violated."""
@@ -25,12 +85,39 @@ class SADIT_Compliance_Checker:
 
     MIN_SNR_THRESHOLD = 15.0  # Decibels
     MIN_RESOLUTION = (1024, 1024)
+    # Rows per block of the streaming quality pass
+    QUALITY_BLOCK_ROWS = 256
+    # Approximate gate: rows sampled and failure probability of its bound
+    QUALITY_SAMPLE_ROWS = 256
+    QUALITY_DELTA = 1e-3
 
     @staticmethod
-    def check_image_safety(image_array: np.ndarray, metadata: dict = None):
+    def check_image_safety(image_array: np.ndarray, metadata: dict = None,
+                           approximate: bool = False):
         """
         FAIL-SAFE: Verifies image quality before processing.
+        Also accepts an ImagePyramid: smoothing lowers the measured noise, so
+        a coarse level failing the SNR gate rejects the image without reading
+        the full resolution; images that pass are confirmed on level 0.
+        The image may be a path to a .npy/DICOM file, a DicomImage (first
+        frame) or a memory-mapped array: it
+        is read in row blocks, never loaded whole. With approximate=True
+        integer images first get an SNR bound from a row sample (see
+        measure_image_quality); an undecided bound, or a float image, runs
+        the exact pass.
         """
+        if isinstance(image_array, (str, os.PathLike)):
+            image_array = (DicomImage(image_array) if is_dicom(image_array)
+                           else np.load(image_array, mmap_mode='r'))
+        if isinstance(image_array, DicomImage):
+            # Stored values straight from the memory map when they need no rescale
+            h = image_array.header
+            plain = (h.rescale_slope, h.rescale_intercept) == (1.0, 0.0) and h.bits_stored == h.bits_allocated
+            image_array = image_array.raw_frame(0) if plain else image_array.modality_frame(0)
+        pyramid = image_array if isinstance(image_array, ImagePyramid) else None
+        if pyramid is not None:
+            image_array = pyramid.full
+
         # check resolution
         if image_array.shape[0] < SADIT_Compliance_Checker.MIN_RESOLUTION[0] or \
            image_array.shape[1] < SADIT_Compliance_Checker.MIN_RESOLUTION[1]:
@@ -38,17 +125,142 @@ class SADIT_Compliance_Checker:
                 f"Image resolution {image_array.shape} below safety threshold {SADIT_Compliance_Checker.MIN_RESOLUTION}."
             )
 
-        # Check Signal-to-Noise Ratio (Simplified Heuristic)
-        signal = np.mean(image_array)
-        noise = np.std(image_array)
-        if noise == 0: noise = 1e-5 # Avoid div by zero
-        snr = 20 * np.log10(signal / noise)
+        if pyramid is not None and pyramid.depth > 1:
+            coarse_snr = SADIT_Compliance_Checker._snr(pyramid.levels[-1])
+            if coarse_snr < SADIT_Compliance_Checker.MIN_SNR_THRESHOLD:
+                raise SafetyException(
+                    f"Image SNR {coarse_snr:.2f}dB is too low. Risk of artifact misinterpretation.")
 
-        if snr < SADIT_Compliance_Checker.MIN_SNR_THRESHOLD:
+        threshold = SADIT_Compliance_Checker.MIN_SNR_THRESHOLD
+        snr = None
+        if approximate:
+            quality = SADIT_Compliance_Checker.measure_image_quality(
+                image_array, approximate=True, laplacian=False)
+            if not quality.approximate:
+                snr = quality.snr_db  # float image: that was already the exact pass
+            else:
+                low, high = quality.snr_bounds_db
+                if low >= threshold:
+                    return True
+                if high < threshold:
+                    snr = high
+        if snr is None:
+            # The gate only needs the moments: a single pass over row blocks
+            moments = _Moments()
+            block_rows = SADIT_Compliance_Checker.QUALITY_BLOCK_ROWS
+            for start in range(0, image_array.shape[0], block_rows):
+                moments.add_block(image_array[start:start + block_rows])
+            snr = SADIT_Compliance_Checker._snr_db(moments.mean, np.sqrt(moments.variance))
+        if snr < threshold:
             raise SafetyException(f"Image SNR {snr:.2f}dB is too low. Risk of artifact misinterpretation.")
 
         return True
 
+    @staticmethod
+    def measure_image_quality(image_array: np.ndarray, approximate: bool = False,
+                              block_rows: int = None, sample_rows: int = None,
+                              delta: float = None, seed: Optional[int] = None,
+                              laplacian: bool = True) -> ImageQualityMetrics:
+        """
+        [STREAMING QUALITY PASS]
+        One pass over row blocks (memory-mapped arrays are paged in block by
+        block): Welford moments of the pixels and of the Laplacian (blocks
+        carry a 1-row halo, so it matches cv2.Laplacian on the whole image),
+        running min/max with the count of pixels clipped at them.
+
+        approximate=True reads `sample_rows` rows drawn without replacement
+        (a fresh random draw unless `seed` is given). Row means of x and of
+        x^2 lie within the dtype's value range, known before reading a pixel,
+        so Hoeffding-Serfling bounds both means, and hence the SNR, with
+        probability 1 - delta whatever the unsampled rows hold. Float images
+        have no such a-priori range: they get the exact pass. The bound is
+        only as tight as the dtype range allows; a few extreme rows can
+        always hide outside a sample, so wide dtypes rarely decide on it.
+        """
+        block_rows = block_rows or SADIT_Compliance_Checker.QUALITY_BLOCK_ROWS
+        sample_rows = sample_rows or SADIT_Compliance_Checker.QUALITY_SAMPLE_ROWS
+        delta = delta or SADIT_Compliance_Checker.QUALITY_DELTA
+        height = image_array.shape[0]
+
+        if approximate and height > sample_rows and np.issubdtype(image_array.dtype, np.integer):
+            rows = np.sort(np.random.default_rng(seed).choice(height, sample_rows, replace=False))
+            return SADIT_Compliance_Checker._approximate_quality(image_array, rows, delta)
+
+        pixels, lap_moments = _Moments(), _Moments()
+        laplacian = laplacian and image_array.ndim == 2
+        low, high, at_low, at_high = np.inf, -np.inf, 0, 0
+        for start in range(0, height, block_rows):
+            stop = min(start + block_rows, height)
+            block = np.asarray(image_array[start:stop])
+            pixels.add_block(block)
+            block_min, block_max = block.min(), block.max()
+            if block_min < low:
+                low, at_low = block_min, 0
+            if block_max > high:
+                high, at_high = block_max, 0
+            at_low += int(np.count_nonzero(block == low))
+            at_high += int(np.count_nonzero(block == high))
+
+            if laplacian:
+                # 1-row halo on each side (image borders reflect, as cv2 does)
+                h0, h1 = max(0, start - 1), min(height, stop + 1)
+                halo = np.asarray(image_array[h0:h1], dtype=np.float32)
+                lap = cv2.Laplacian(halo, cv2.CV_32F)
+                lap_moments.add_block(lap[start - h0:start - h0 + stop - start])
+
+        clipped = at_high + (at_low if low != high else 0)
+        return ImageQualityMetrics(
+            shape=tuple(image_array.shape), mean=pixels.mean, std=float(np.sqrt(pixels.variance)),
+            snr_db=SADIT_Compliance_Checker._snr_db(pixels.mean, np.sqrt(pixels.variance)),
+            min_value=float(low), max_value=float(high),
+            saturation_fraction=clipped / max(pixels.n, 1),
+            laplacian_variance=lap_moments.variance if laplacian else None)
+
+    @staticmethod
+    def _approximate_quality(image_array: np.ndarray, rows: np.ndarray,
+                             delta: float) -> ImageQualityMetrics:
+        sample = np.asarray(image_array[rows], dtype=np.float64).reshape(len(rows), -1)
+        # A-priori range: every row statistic of any row (sampled or not) is in it
+        info = np.iinfo(image_array.dtype)
+        low, value_range = float(info.min), float(info.max) - float(info.min)
+        shifted = sample - low  # in [0, R]: both row statistics are bounded
+        m, n = len(rows), image_array.shape[0]
+        # Hoeffding-Serfling (sampling without replacement), two statistics
+        # (union bound: delta / 2 each)
+        eps = np.sqrt((1 - (m - 1) / n) * np.log(4 / delta) / (2 * m))
+        mean_shift = float(shifted.mean())
+        second = float(np.mean(shifted * shifted))
+        mean_lo, mean_hi = max(0.0, mean_shift - value_range * eps), mean_shift + value_range * eps
+        second_lo, second_hi = max(0.0, second - value_range ** 2 * eps), second + value_range ** 2 * eps
+        std_lo = np.sqrt(max(0.0, second_lo - mean_hi ** 2))
+        std_hi = np.sqrt(max(0.0, second_hi - mean_lo ** 2))
+
+        mean = mean_shift + low
+        std = float(np.sqrt(max(0.0, second - mean_shift ** 2)))
+        snr_db = SADIT_Compliance_Checker._snr_db
+        # Sample estimates (not bounds) of the value range and saturation
+        sample_low, sample_high = float(sample.min()), float(sample.max())
+        clipped = (np.count_nonzero(sample == sample_high)
+                   + (np.count_nonzero(sample == sample_low) if sample_high > sample_low else 0))
+        return ImageQualityMetrics(
+            shape=tuple(image_array.shape), mean=mean, std=std, snr_db=snr_db(mean, std),
+            min_value=sample_low, max_value=sample_high, saturation_fraction=float(clipped / sample.size),
+            laplacian_variance=None, approximate=True,
+            snr_bounds_db=(snr_db(mean_lo + low, std_hi), snr_db(mean_hi + low, std_lo)))
+
+    @staticmethod
+    def _snr(image_array: np.ndarray) -> float:
+        moments = _Moments()
+        moments.add_block(image_array)
+        return SADIT_Compliance_Checker._snr_db(moments.mean, np.sqrt(moments.variance))
+
+    @staticmethod
+    def _snr_db(signal: float, noise: float) -> float:
+        # Check Signal-to-Noise Ratio (Simplified Heuristic)
+        if noise == 0: noise = 1e-5 # Avoid div by zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(20 * np.log10(signal / noise))
+
     @staticmethod
     def validate_inference(result: DiagnosticResult):
         """
@@ -0,0 +1,286 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .bayesian import DIAGNOSIS_STATES, EVIDENCE_NODES
+
+# Free-text diagnosis labels (MedicalRecord.inferred_diagnosis) -> Diagnosis state.
+# Checked in order; infection wins over mechanical wording ("CRITICAL: ... Septic").
+DIAGNOSIS_KEYWORDS = [
+    ('Infection', ('infection', 'pji', 'septic', 'osteomyelitic')),
+    ('Scenario_B', ('scenario_b', 'scenario b', 'loosening')),
+    ('Scenario_A', ('scenario_a', 'scenario a', 'impact', 'mismatch')),
+]
+
+
+def diagnosis_state_from_label(label: Optional[str]) -> Optional[str]:
+    """Maps a stored diagnosis text to a Diagnosis state (None if unlabeled)."""
+    if not label:
+        return None
+    text = label.lower()
+    for state, keywords in DIAGNOSIS_KEYWORDS:
+        if any(k in text for k in keywords):
+            return state
+    return None
+
+
+@dataclass(frozen=True)
+class CPDSnapshot:
+    """
+    Versioned, read-only set of CPDs published by the learner.
+    Arrays follow the engine's conventions: prior ordered as DIAGNOSIS_STATES,
+    likelihoods[node] shaped (card, 3).
+    """
+    tenant_id: Optional[int]
+    version: int
+    prior: np.ndarray
+    likelihoods: dict
+    state_names: dict
+    n_observations: int
+    last_record_id: int
+
+    def to_tabular_cpds(self) -> list:
+        from pgmpy.factors.discrete import TabularCPD
+
+        cpds = [TabularCPD(variable='Diagnosis', variable_card=len(DIAGNOSIS_STATES),
+                           values=self.prior.reshape(-1, 1),
+                           state_names={'Diagnosis': DIAGNOSIS_STATES})]
+        for node in EVIDENCE_NODES:
+            values = self.likelihoods[node]
+            cpds.append(TabularCPD(variable=node, variable_card=values.shape[0],
+                                   values=values,
+                                   evidence=['Diagnosis'], evidence_card=[len(DIAGNOSIS_STATES)],
+                                   state_names={node: self.state_names[node],
+                                                'Diagnosis': DIAGNOSIS_STATES}))
+        return cpds
+
+
+@dataclass
+class SufficientStatistics:
+    """
+    Dirichlet counts for every CPD of the naive-Bayes structure.
+    counts[node][state, diagnosis] and diagnosis_counts[diagnosis] include
+    the prior pseudo-counts, so the posterior-mean CPD is a column
+    normalization.
+    """
+    diagnosis_counts: np.ndarray
+    counts: dict
+    n_observations: int = 0
+    last_record_id: int = 0
+    version: int = 0
+    # Ids of non-database sources (e.g. knowledge-base files) already counted
+    sources: set = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class OnlineCPDLearner:
+    """
+    [ONLINE LEARNING]
+    Incremental Bayesian estimation of the SaditBayesianEngine CPDs.
+    Keeps per-tenant Dirichlet sufficient statistics and updates them from
+    new observations only (O(new rows)); history is never rescanned.
+    Published snapshots are installed with SaditBayesianEngine.load_snapshot.
+    """
+
+    def __init__(self, prior: np.ndarray, likelihoods: dict, state_names: dict,
+                 equivalent_sample_size: float = 10.0):
+        # Prior pseudo-counts: the expert CPDs weighted as `equivalent_sample_size` cases
+        self.state_names = {node: list(state_names[node]) for node in EVIDENCE_NODES}
+        self.equivalent_sample_size = equivalent_sample_size
+        self._prior_diagnosis = np.asarray(prior, dtype=np.float64) * equivalent_sample_size
+        self._prior_counts = {
+            node: np.asarray(likelihoods[node], dtype=np.float64) * self._prior_diagnosis
+            for node in EVIDENCE_NODES}
+        self._tenants = {}
+        self._tenants_lock = threading.Lock()
+
+    @classmethod
+    def load_or_create(cls, path: str, engine, equivalent_sample_size: float = 10.0) -> "OnlineCPDLearner":
+        """
+        Long-lived learner: resumes the counts saved at `path`, or starts from
+        the engine's CPDs when no state has been saved yet.
+        """
+        learner = cls.from_engine(engine, equivalent_sample_size)
+        if os.path.exists(path):
+            learner.load(path)
+        return learner
+
+    @classmethod
+    def from_engine(cls, engine, equivalent_sample_size: float = 10.0) -> "OnlineCPDLearner":
+        compiled = engine.compiled
+        return cls(prior=compiled.prior,
+                   likelihoods={node: compiled.likelihoods[node][:-1]
+                                for node in EVIDENCE_NODES},
+                   state_names=compiled.state_names,
+                   equivalent_sample_size=equivalent_sample_size)
+
+    def statistics(self, tenant_id: Optional[int]) -> SufficientStatistics:
+        with self._tenants_lock:
+            stats = self._tenants.get(tenant_id)
+            if stats is None:
+                stats = SufficientStatistics(
+                    diagnosis_counts=self._prior_diagnosis.copy(),
+                    counts={node: c.copy() for node, c in self._prior_counts.items()})
+                self._tenants[tenant_id] = stats
+            return stats
+
+    def update(self, tenant_id: Optional[int], observations: Iterable[Tuple[str, dict]],
+               last_record_id: Optional[int] = None) -> int:
+        """
+        Adds labeled observations: (diagnosis_state, evidence) pairs where
+        evidence is a (possibly partial) {node: state} dict as produced by
+        SaditBayesianEngine.map_evidence. Unobserved nodes only update the
+        diagnosis counts. Returns the number of observations applied.
+        """
+        diagnosis_index = {state: i for i, state in enumerate(DIAGNOSIS_STATES)}
+        state_index = {node: {s: i for i, s in enumerate(self.state_names[node])}
+                       for node in EVIDENCE_NODES}
+
+        diag_idx = []
+        node_rows = {node: ([], []) for node in EVIDENCE_NODES}
+        for diagnosis, evidence in observations:
+            d = diagnosis_index[diagnosis]
+            diag_idx.append(d)
+            for node, state in evidence.items():
+                states, diags = node_rows[node]
+                states.append(state_index[node][state])
+                diags.append(d)
+
+        stats = self.statistics(tenant_id)
+        with stats.lock:
+            np.add.at(stats.diagnosis_counts, np.asarray(diag_idx, dtype=np.intp), 1.0)
+            for node, (states, diags) in node_rows.items():
+                if states:
+                    np.add.at(stats.counts[node],
+                              (np.asarray(states, dtype=np.intp), np.asarray(diags, dtype=np.intp)), 1.0)
+            stats.n_observations += len(diag_idx)
+            if last_record_id is not None:
+                stats.last_record_id = max(stats.last_record_id, last_record_id)
+        return len(diag_idx)
+
+    def update_from_sources(self, tenant_id: Optional[int], observations: dict) -> int:
+        """
+        Adds {source_id: (diagnosis_state, evidence)} observations, skipping
+        sources already counted for this tenant, so re-scanning a directory
+        never counts the same file twice.
+        """
+        stats = self.statistics(tenant_id)
+        with stats.lock:
+            new_ids = [s for s in observations if s not in stats.sources]
+        applied = self.update(tenant_id, [observations[s] for s in new_ids])
+        with stats.lock:
+            stats.sources.update(new_ids)
+        return applied
+
+    def update_from_records(self, tenant_id: Optional[int], records: Iterable, engine) -> int:
+        """
+        Applies MedicalRecord rows (src/clinical/models_db.py). Evidence comes
+        from pain_profile_json ('location', 'character' and, when the
+        front-end stored them, 'ild_months', 'imaging_status', 'mobility');
+        the label from inferred_diagnosis. Unlabeled rows are skipped but
+        still advance the watermark.
+        """
+        observations = []
+        last_id = None
+        for record in records:
+            last_id = record.id if last_id is None else max(last_id, record.id)
+            diagnosis = diagnosis_state_from_label(record.inferred_diagnosis)
+            if diagnosis is None:
+                continue
+            pp = record.pain_profile_json or {}
+            evidence = engine.map_evidence(
+                location=pp.get('location'),
+                pain_character=pp.get('character'),
+                ild_months=pp.get('ild_months'),
+                imaging_status=pp.get('imaging_status'),
+                mobility=pp.get('mobility'))
+            observations.append((diagnosis, evidence))
+        return self.update(tenant_id, observations, last_record_id=last_id)
+
+    def ingest_new_records(self, db, tenant_id: Optional[int], engine, batch_size: int = 5000) -> int:
+        """
+        Pulls MedicalRecord rows newer than the tenant's watermark, in id
+        order and bounded batches. `db` must be a Session already bound to
+        the tenant schema (schema isolation is handled by the caller).
+        """
+        from src.clinical.models_db import MedicalRecord
+
+        applied = 0
+        while True:
+            watermark = self.statistics(tenant_id).last_record_id
+            rows = (db.query(MedicalRecord)
+                    .filter(MedicalRecord.id > watermark)
+                    .order_by(MedicalRecord.id)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                return applied
+            applied += self.update_from_records(tenant_id, rows, engine)
+
+    def publish(self, tenant_id: Optional[int]) -> CPDSnapshot:
+        """
+        Freezes the current posterior-mean CPDs into a new snapshot version.
+        """
+        stats = self.statistics(tenant_id)
+        with stats.lock:
+            stats.version += 1
+            prior = stats.diagnosis_counts / stats.diagnosis_counts.sum()
+            likelihoods = {node: c / c.sum(axis=0, keepdims=True)
+                           for node, c in stats.counts.items()}
+            snapshot = CPDSnapshot(
+                tenant_id=tenant_id,
+                version=stats.version,
+                prior=prior,
+                likelihoods=likelihoods,
+                state_names=self.state_names,
+                n_observations=stats.n_observations,
+                last_record_id=stats.last_record_id)
+
+        for array in [snapshot.prior, *snapshot.likelihoods.values()]:
+            array.flags.writeable = False
+        return snapshot
+
+    def save(self, path: str):
+        """
+        Persists every tenant's counts (e.g. to the /app/learning volume) so a
+        restart resumes from the watermark instead of replaying history.
+        """
+        arrays = {}
+        with self._tenants_lock:
+            tenants = dict(self._tenants)
+        for tenant_id, stats in tenants.items():
+            key = 'global' if tenant_id is None else str(tenant_id)
+            with stats.lock:
+                arrays[f"{key}/Diagnosis"] = stats.diagnosis_counts.copy()
+                for node, c in stats.counts.items():
+                    arrays[f"{key}/{node}"] = c.copy()
+                arrays[f"{key}/meta"] = np.array(
+                    [stats.n_observations, stats.last_record_id, stats.version], dtype=np.int64)
+                arrays[f"{key}/sources"] = np.array(sorted(stats.sources), dtype=str)
+        # Write-then-rename so a crash never leaves a truncated state file
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        with np.load(path) as data:
+            keys = {name.split('/')[0] for name in data.files}
+            for key in keys:
+                tenant_id = None if key == 'global' else int(key)
+                n_obs, last_id, version = (int(v) for v in data[f"{key}/meta"])
+                for node in EVIDENCE_NODES:
+                    if data[f"{key}/{node}"].shape != self._prior_counts[node].shape:
+                        raise ValueError(
+                            f"Learner state {path} was saved for a different {node} "
+                            f"discretization {data[f'{key}/{node}'].shape}")
+                stats = SufficientStatistics(
+                    diagnosis_counts=data[f"{key}/Diagnosis"].copy(),
+                    counts={node: data[f"{key}/{node}"].copy() for node in EVIDENCE_NODES},
+                    n_observations=n_obs, last_record_id=last_id, version=version,
+                    sources=set(data[f"{key}/sources"].tolist()) if f"{key}/sources" in data.files else set())
+                with self._tenants_lock:
+                    self._tenants[tenant_id] = stats
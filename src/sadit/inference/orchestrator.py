@@ -1,9 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+
 from ..clinical.models import ClinicalInput, PainProfile
 from ..clinical.semiology import SemiologyEngine
-from ..physics.materials import MaterialBioMatch
-from ..physics.stress import StressCalculator
+from ..physics.assessment import assessment_grid
+from ..physics.load_transfer import load_transfer_model
 from ..compliance.checker import SADIT_Compliance_Checker, DiagnosticResult
-from .bayesian import SaditBayesianEngine
+from .bayesian import load_engine
+from .pipeline import Stage, StagePipeline
+
+
+@dataclass
+class CaseOutcome:
+    """One case of analyze_cases: exactly one of result / error is set."""
+    result: Optional[DiagnosticResult] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_image(path) -> np.ndarray:
+    """
+    Reads an image file (.npy, DICOM or any format OpenCV decodes) as an array.
+    .npy files are memory-mapped (read-only): pages are read on demand.
+    DICOM files yield their first frame, windowed to [0, 1] float32.
+    """
+    if str(path).endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    from ..vision.dicom import DicomImage, is_dicom
+    if is_dicom(path):
+        return DicomImage(path).frame(0)
+    import cv2
+    image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Could not read image {path}")
+    return image
+
+
+def _check_image(image) -> bool:
+    """
+    Image stage of analyze_cases, run in a worker process. Paths are loaded
+    in the worker, so only the file name crosses the process boundary
+    (.npy files are memory-mapped and gated block by block).
+    """
+    if isinstance(image, (str, os.PathLike)):
+        image = load_image(image)
+    return SADIT_Compliance_Checker.check_image_safety(image)
 
 
 class SADIT_Orchestrator:
@@ -12,33 +60,219 @@ class SADIT_Orchestrator:
     Triangulates Clinical Information (ALICIA), Imaging (Simulated), Physics, AND Bayesian Inference.
     """
 
-    def __init__(self):
-        self.clinical = SemiologyEngine()
+    def __init__(self, bayesian=None, semiology: SemiologyEngine = None,
+                 uncertainty: str = "monte_carlo", concurrent_stages: bool = True,
+                 emulator=None):
+        # Engines can be injected to share one instance process-wide
+        self.clinical = semiology or SemiologyEngine()
         self.checker = SADIT_Compliance_Checker
-        self.bayesian = SaditBayesianEngine()
+        self.bayesian = bayesian or load_engine()
+        # CZT emulator for the enrichment stage (injected with its vision cache)
+        self.emulator = emulator
+        # 'monte_carlo': Dirichlet CPD sampling; 'fixed': legacy +/-0.05 band
+        self.uncertainty = uncertainty
+        self.concurrent_stages = concurrent_stages
+        self.pipeline = StagePipeline(self._stages())
+
+    def _stages(self) -> list:
+        """
+        analyze_case as a DAG: the image check, physics, semiology, Bayes and
+        the Monte Carlo interval are independent; synthesis needs them all.
+        Optional stages (cut first under a latency budget): CZT enrichment
+        (dropped), full-resolution texture analysis (decimated image) and the
+        Monte Carlo interval (fixed band).
+        """
+        return [
+            # 1. Safety Check (Compliance)
+            Stage("image_safety", lambda c: c["image_array"] is None
+                  or self.checker.check_image_safety(c["image_array"])),
+            # 1b. Optional image analysis
+            Stage("enrichment", self._enrichment_stage, requires=("image_safety",), optional=True),
+            Stage("texture", lambda c: self._texture_stage(c, step=1), requires=("enrichment",),
+                  optional=True, degrade=lambda c: self._texture_stage(c, step=4)),
+            # 2. Physics Analysis
+            Stage("physics", lambda c: self._assess_physics(c["clinical_data"], c["implant_type"])),
+            Stage("load_transfer", lambda c: self._load_transfer(c["implant_type"])),
+            # 3. Clinical Analysis (Rule-Based ALICIA)
+            Stage("semiology", lambda c: self.clinical.process(c["clinical_data"])),
+            # 4. Bayesian Inference (Probabilistic)
+            Stage("bayesian", lambda c: c["bayesian_engine"].infer_diagnosis(**c["evidence"])),
+            Stage("uncertainty", lambda c: c["bayesian_engine"].infer_diagnosis_interval(**c["evidence"])
+                  if self.uncertainty == "monte_carlo" else None, optional=True),
+            # 5-6. Synthesis and validation
+            Stage("synthesis", self._synthesis_stage,
+                  requires=("image_safety", "texture", "physics", "load_transfer", "semiology",
+                            "bayesian", "uncertainty")),
+        ]
+
+    def _enrichment_stage(self, c: dict):
+        if c["image_array"] is None or not c["image_analysis"]:
+            return None
+        if self.emulator is None:
+            from ..vision.enhancement import CZTEnhancedEmulator
+            self.emulator = CZTEnhancedEmulator()
+        return self.emulator.enrich_image(c["image_array"])
+
+    @staticmethod
+    def _texture_stage(c: dict, step: int):
+        image = c["enrichment"] if c["enrichment"] is not None else c["image_array"]
+        if image is None or not c["image_analysis"]:
+            return None
+        from ..vision.optimizer import VisionHeuristicOptimizer
+        roughness = VisionHeuristicOptimizer().analyze_texture_roughness(image[::step, ::step])
+        return {"texture_roughness": float(roughness), "texture_step": step,
+                "enriched": c["enrichment"] is not None}
+
+    def _synthesis_stage(self, c: dict) -> DiagnosticResult:
+        bayes_result = c["bayesian"]
+        probs = [bayes_result.scenario_a_prob,
+                 bayes_result.scenario_b_prob, bayes_result.infection_prob]
+        interval = c["uncertainty"]
+        result = self._synthesize(
+            probs, bayes_result.most_likely_diagnosis, c["physics"], c["evidence"],
+            None if interval is None else (interval.lower, interval.upper),
+            # Interval stage cut by the budget -> fixed band, no resampling here
+            uncertainty=self.uncertainty if interval is not None else "fixed")
+        result.image_findings = c["texture"] or {}
+        result.load_transfer = c["load_transfer"]
+        return result
 
     def analyze_case(self,
                      clinical_data: ClinicalInput,
                      implant_type: str,
                      image_array=None,
-                     imaging_status: str = "Stable") -> DiagnosticResult:
+                     imaging_status: str = None,
+                     image_analysis: bool = False,
+                     latency_budget_ms: Optional[float] = None,
+                     bayesian=None) -> DiagnosticResult:
+        """
+        Runs the stage DAG for one case. The first failing stage's exception
+        is raised (e.g. SafetyException); otherwise the result carries one
+        StageTiming per stage in `stage_timings`.
+        image_analysis adds CZT enrichment and texture analysis of the image.
+        With latency_budget_ms, optional stages that would not fit in the
+        remaining budget are degraded or dropped and listed in
+        `degraded_stages` (an explicitly partial answer).
+        bayesian overrides the orchestrator's engine for this call (e.g. a
+        tenant's CPD variant) while sharing every other engine and the
+        stage thread pool.
+        """
+        run = self.pipeline.run({
+            "bayesian_engine": bayesian or self.bayesian,
+            "clinical_data": clinical_data,
+            "implant_type": implant_type,
+            "image_array": image_array,
+            "image_analysis": image_analysis,
+            "evidence": self._bayesian_evidence(clinical_data, imaging_status),
+        }, concurrent=self.concurrent_stages, budget_ms=latency_budget_ms)
+        run.raise_first_error()
+
+        result = run.outputs["synthesis"]
+        result.stage_timings = run.timings
+        result.degraded_stages = run.degraded
+        return result
+
+    def analyze_cases(self, cases: Iterable[tuple], max_workers: Optional[int] = None,
+                      executor=None) -> list:
+        """
+        [BATCH ANALYSIS]
+        Runs analyze_case over (clinical_data, implant_type, image, imaging_status)
+        tuples (image and imaging_status may be omitted or None; image may be
+        an array or a file path). Image safety checks are fanned out to a
+        process pool (`executor`, or one of `max_workers` processes created
+        for the call); the Bayesian stage is one vectorized batch call.
+        Returns one CaseOutcome per case, in input order; a failing case
+        records its exception without aborting the batch.
+        """
+        cases = [tuple(case) + (None,) * (4 - len(case)) for case in cases]
+        outcomes = [CaseOutcome() for _ in cases]
+
+        # 1. Image stage -> worker processes (started first, overlaps the rest)
+        image_cases = [i for i, case in enumerate(cases) if case[2] is not None]
+        own_executor = None
+        futures = {}
+        if image_cases:
+            if executor is None and (max_workers or os.cpu_count() or 1) > 1 and len(image_cases) > 1:
+                executor = own_executor = ProcessPoolExecutor(max_workers=max_workers)
+            if executor is not None:
+                futures = {i: executor.submit(_check_image, cases[i][2]) for i in image_cases}
+
+        try:
+            # 2-3. Cheap per-case stages: semiology rules, then physics as one
+            # lookup into the precomputed assessment grid
+            physics = [None] * len(cases)
+            materials = {}
+            for i, (clinical_data, implant_type, _, _) in enumerate(cases):
+                try:
+                    materials[i] = self._implant_material(implant_type)
+                    self.clinical.process(clinical_data)
+                except Exception as e:
+                    outcomes[i].error = e
+            assessed = [i for i in materials if outcomes[i].error is None]
+            for i, assessment in zip(assessed, assessment_grid().assess_batch(
+                    [materials[i] for i in assessed],
+                    [cases[i][0].pain_profile.location for i in assessed])):
+                physics[i] = assessment
+            # One FE solve per implant material (factorizations are cached)
+            load_transfer = {m: load_transfer_model(m).solve() for m in set(materials.values())}
 
-        # 1. Safety Check (Compliance)
-        if image_array is not None:
-            self.checker.check_image_safety(image_array)
+            # 4. Bayesian stage, vectorized over all cases still valid
+            valid = [i for i in range(len(cases)) if outcomes[i].error is None]
+            evidence = {i: self._bayesian_evidence(cases[i][0], cases[i][3]) for i in valid}
+            posteriors = self._bayesian_batch([evidence[i] for i in valid])
+            intervals = self._interval_batch([evidence[i] for i in valid])
 
-        # 2. Physics Analysis
-        mat_key = "cobalt_chrome" if "austin" in implant_type.lower() else "titanium_alloy"
-        mismatch = MaterialBioMatch.calculate_stiffness_mismatch(
-            mat_key, "cortical_bone")
-        physics_assess = StressCalculator.assess_stress_conditions(
-            mismatch, clinical_data.pain_profile.location)
+            # Image results (inline when no pool is used)
+            for i in image_cases:
+                if outcomes[i].error is not None:
+                    continue
+                try:
+                    if i in futures:
+                        futures[i].result()
+                    else:
+                        _check_image(cases[i][2])
+                except Exception as e:
+                    outcomes[i].error = e
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown(cancel_futures=True)
 
-        # 3. Clinical Analysis (Rule-Based ALICIA)
-        clinical_result = self.clinical.process(clinical_data)
+        # 5-6. Synthesis and validation per case
+        for k, (i, posterior) in enumerate(zip(valid, posteriors)):
+            if outcomes[i].error is not None:
+                continue
+            try:
+                if isinstance(posterior, Exception):
+                    raise posterior
+                probs, most_likely = posterior
+                interval = None if intervals is None else (intervals.lower[k], intervals.upper[k])
+                outcomes[i].result = self._synthesize(probs, most_likely, physics[i], evidence[i], interval)
+                outcomes[i].result.load_transfer = load_transfer[materials[i]].summary()
+            except Exception as e:
+                outcomes[i].error = e
+        return outcomes
 
-        # 4. Bayesian Inference (Probabilistic)
-        bayes_result = self.bayesian.infer_diagnosis(
+    # --- Stages shared by analyze_case and analyze_cases ---
+
+    @staticmethod
+    def _implant_material(implant_type: str) -> str:
+        return "cobalt_chrome" if "austin" in implant_type.lower() else "titanium_alloy"
+
+    @staticmethod
+    def _assess_physics(clinical_data: ClinicalInput, implant_type: str) -> Mapping:
+        # Read-only mapping shared with every case of the same combination
+        return assessment_grid().assess(
+            SADIT_Orchestrator._implant_material(implant_type),
+            clinical_data.pain_profile.location)
+
+    @staticmethod
+    def _load_transfer(implant_type: str) -> dict:
+        # Stem FE model under the gait hip load: stress profile -> Gruen shielding
+        return load_transfer_model(SADIT_Orchestrator._implant_material(implant_type)).solve().summary()
+
+    @staticmethod
+    def _bayesian_evidence(clinical_data: ClinicalInput, imaging_status: Optional[str]) -> dict:
+        return dict(
             location=clinical_data.pain_profile.location,
             pain_character=clinical_data.pain_profile.character,
             ild_months=clinical_data.ild_months,
@@ -46,27 +280,77 @@ class SADIT_Orchestrator:
             mobility=clinical_data.mobility_assistance
         )
 
+    def _bayesian_batch(self, evidence: list) -> list:
+        """
+        (probs, most_likely) per case from one infer_diagnosis_batch call.
+        If the batch cannot be mapped (e.g. a malformed value), cases are
+        re-run one by one so only the faulty ones report an error.
+        """
+        if not evidence:
+            return []
+        try:
+            batch = self.bayesian.infer_diagnosis_batch(
+                **{field: [e[field] for e in evidence] for field in evidence[0]})
+            return [([batch.scenario_a_prob[k], batch.scenario_b_prob[k], batch.infection_prob[k]],
+                     str(batch.most_likely_diagnosis[k])) for k in range(len(batch))]
+        except Exception:
+            posteriors = []
+            for e in evidence:
+                try:
+                    r = self.bayesian.infer_diagnosis(**e)
+                    posteriors.append(([r.scenario_a_prob, r.scenario_b_prob, r.infection_prob],
+                                       r.most_likely_diagnosis))
+                except Exception as error:
+                    posteriors.append(error)
+            return posteriors
+
+    def _interval_batch(self, evidence: list):
+        """Monte Carlo intervals for all cases at once (None: computed per case)."""
+        if self.uncertainty != "monte_carlo" or not evidence:
+            return None
+        try:
+            return self.bayesian.infer_diagnosis_interval_batch(
+                **{field: [e[field] for e in evidence] for field in evidence[0]})
+        except Exception:
+            return None
+
+    def _synthesize(self, probs: list, most_likely: str, physics_assess: Mapping,
+                    evidence: dict, interval: Optional[tuple] = None,
+                    uncertainty: Optional[str] = None) -> DiagnosticResult:
         # 5. Synthesis / Triangulation (Final Inference)
-        final_diagnosis = f"Bayesian Consensus: {bayes_result.most_likely_diagnosis}"
-        final_confidence = max(bayes_result.scenario_a_prob,
-                               bayes_result.scenario_b_prob, bayes_result.infection_prob)
+        final_diagnosis = f"Bayesian Consensus: {most_likely}"
+        final_confidence = float(max(probs))
+        bayes_confidence = final_confidence
         final_citation = f"Bayesian Network v1.1.9 (P={final_confidence:.2f})"
 
         # Refine diagnosis with physics & rules
-        if physics_assess["tip_stress_risk"] == "Critical" and "Scenario_A" in bayes_result.most_likely_diagnosis:
+        if physics_assess["tip_stress_risk"] == "Critical" and "Scenario_A" in most_likely:
             final_diagnosis += f" | CONFIRMED by Physics: {physics_assess['mechanism']}"
             final_confidence = min(0.99, final_confidence + 0.10)
             final_citation += f" + {physics_assess['citation']}"
 
-        if "Infection" in bayes_result.most_likely_diagnosis:
+        if "Infection" in most_likely:
             final_diagnosis = "CRITICAL: " + final_diagnosis
 
+        # Uncertainty of the reported probability: sampled CPD interval of the
+        # winning diagnosis, shifted by any physics adjustment
+        if (uncertainty or self.uncertainty) == "monte_carlo":
+            if interval is None:
+                sampled = self.bayesian.infer_diagnosis_interval(**evidence)
+                interval = (sampled.lower, sampled.upper)
+            winner = int(np.argmax(probs))
+            shift = final_confidence - bayes_confidence
+            confidence_interval = (float(max(0.0, interval[0][winner] + shift)),
+                                   float(min(1.0, interval[1][winner] + shift)))
+        else:
+            confidence_interval = (final_confidence - 0.05,
+                                   min(1.0, final_confidence + 0.05))
+
         # 6. Validation (Anti-Hallucination)
         final_result = DiagnosticResult(
             diagnosis=final_diagnosis,
             probability=final_confidence,
-            confidence_interval=(final_confidence - 0.05,
-                                 min(1.0, final_confidence + 0.05)),
+            confidence_interval=confidence_interval,
             citation_source=final_citation
         )
 
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline DAG. func receives a dict holding the run
+    inputs plus the outputs of `requires` (keyed by stage name) and returns
+    this stage's output.
+    Optional stages may be cut when a run has a latency budget: `degrade`
+    (a cheaper variant with the same signature) runs instead, or, without
+    one, the stage is dropped and its output is None.
+    """
+    name: str
+    func: Callable[[dict], object]
+    requires: Tuple[str, ...] = ()
+    optional: bool = False
+    degrade: Optional[Callable[[dict], object]] = None
+
+
+@dataclass
+class StageTiming:
+    name: str
+    # 'ok' | 'error' | 'skipped' (an upstream stage failed) |
+    # 'degraded' (cheaper variant ran) | 'dropped' (not run, output None)
+    status: str
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0  # CPU time of the thread that ran the stage
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineRun:
+    outputs: Dict[str, object]
+    timings: List[StageTiming]
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+    @property
+    def degraded(self) -> List[str]:
+        return [t.name for t in self.timings if t.status in ("degraded", "dropped")]
+
+    def raise_first_error(self):
+        """Re-raises the error of the earliest failed stage (declaration order)."""
+        for timing in self.timings:
+            if timing.name in self.errors:
+                raise self.errors[timing.name]
+
+
+class StagePipeline:
+    """
+    [STAGE DAG]
+    Runs a set of Stages respecting their dependencies: every stage whose
+    requirements are met is submitted to a thread pool at once, so
+    independent stages (e.g. image checks, physics, semiology, Bayes)
+    overlap. NumPy/OpenCV release the GIL in their kernels, which is where
+    the image stages spend their time.
+    A failed stage does not stop independent ones; its dependents are
+    skipped. Every stage gets a StageTiming (wall and thread CPU time).
+
+    [LATENCY BUDGET]
+    With run(budget_ms=...), an optional stage is degraded (or dropped)
+    when its expected duration (moving average of its past full runs)
+    exceeds the remaining budget, and optional stages still running at the
+    deadline are abandoned: their thread finishes in the background but the
+    result is not waited for. Required stages are always awaited.
+    """
+
+    # Weight of the latest run in the per-stage duration estimate
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, stages: List[Stage], max_workers: Optional[int] = None):
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        for s in stages:
+            missing = set(s.requires) - set(names)
+            if missing:
+                raise ValueError(f"Stage '{s.name}' requires unknown stages {sorted(missing)}")
+        self.stages = list(stages)
+        self.max_workers = max_workers or len(stages)
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        # Expected wall time (ms) of each stage's full variant
+        self.expected_ms: Dict[str, float] = {}
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        done = set()
+        pending = list(self.stages)
+        while pending:
+            ready = [s for s in pending if set(s.requires) <= done]
+            if not ready:
+                raise ValueError(f"Stage graph has a cycle among {[s.name for s in pending]}")
+            done.update(s.name for s in ready)
+            pending = [s for s in pending if s.name not in done]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created lazily and per process: worker threads do not survive a fork
+        # (pre-forking servers build the orchestrator in the master).
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="sadit-stage")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    @staticmethod
+    def _timed(func: Callable, context: dict):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            output, error = func(context), None
+        except Exception as e:
+            output, error = None, e
+        return output, error, (time.perf_counter() - wall) * 1e3, (time.thread_time() - cpu) * 1e3
+
+    def _record(self, name: str, wall_ms: float):
+        previous = self.expected_ms.get(name)
+        self.expected_ms[name] = wall_ms if previous is None else (
+            (1 - self.EWMA_ALPHA) * previous + self.EWMA_ALPHA * wall_ms)
+
+    def run(self, inputs: dict, concurrent: bool = True,
+            budget_ms: Optional[float] = None) -> PipelineRun:
+        outputs, errors, timings = {}, {}, {}
+        pending = {s.name: s for s in self.stages}
+        running = {}
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1e3
+
+        def remaining_ms():
+            return float("inf") if deadline is None else (deadline - time.perf_counter()) * 1e3
+
+        def cut(stage):
+            # Degraded variant inline (cheap by contract), or drop the stage
+            if stage.degrade is None:
+                outputs[stage.name] = None
+                timings[stage.name] = StageTiming(stage.name, "dropped")
+                return
+            output, error, wall_ms, cpu_ms = self._timed(stage.degrade, context_for(stage))
+            if error is None:
+                outputs[stage.name] = output
+                timings[stage.name] = StageTiming(stage.name, "degraded", wall_ms, cpu_ms)
+            else:
+                finish(stage, (output, error, wall_ms, cpu_ms), full=False)
+
+        def func_for(stage):
+            # None: cut the stage before starting it
+            if stage.optional and self.expected_ms.get(stage.name, 0.0) > remaining_ms():
+                return None
+            return stage.func
+
+        def context_for(stage):
+            context = dict(inputs)
+            context.update({name: outputs[name] for name in stage.requires})
+            return context
+
+        def finish(stage, result, full=True):
+            output, error, wall_ms, cpu_ms = result
+            if full and error is None:
+                self._record(stage.name, wall_ms)
+            if error is None:
+                outputs[stage.name] = output
+                timings[stage.name] = StageTiming(stage.name, "ok", wall_ms, cpu_ms)
+            else:
+                errors[stage.name] = error
+                timings[stage.name] = StageTiming(stage.name, "error", wall_ms, cpu_ms,
+                                                  f"{type(error).__name__}: {error}")
+
+        while pending or running:
+            # Dependents of failed/skipped stages are skipped
+            for name, stage in list(pending.items()):
+                if any(r in timings and timings[r].status in ("error", "skipped") for r in stage.requires):
+                    timings[name] = StageTiming(name, "skipped")
+                    del pending[name]
+
+            ready = [s for s in pending.values() if all(r in outputs for r in s.requires)]
+            for stage in ready:
+                del pending[stage.name]
+            for stage in [s for s in ready if func_for(s) is None]:
+                ready.remove(stage)
+                cut(stage)
+            if not concurrent:
+                for stage in ready:
+                    if func_for(stage) is None:  # budget spent by earlier stages
+                        cut(stage)
+                    else:
+                        finish(stage, self._timed(stage.func, context_for(stage)))
+                continue
+
+            # Run one required ready stage on the calling thread (optional ones
+            # stay on the pool so they can be abandoned), the rest on the pool
+            required_ready = [st for st in ready if not st.optional]
+            inline = required_ready[-1] if required_ready and not running else None
+            if inline is not None:
+                ready.remove(inline)
+            for stage in ready:
+                running[self._pool().submit(self._timed, stage.func, context_for(stage))] = stage
+            if inline is not None:
+                finish(inline, self._timed(inline.func, context_for(inline)))
+            if running:
+                # Only optional stages may be abandoned at the deadline
+                required = any(not s.optional for s in running.values())
+                timeout = None if required or deadline is None else max(0.0, remaining_ms() / 1e3)
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+                if not done:
+                    for future in list(running):
+                        cut(running.pop(future))
+
+        ordered = [timings[s.name] for s in self.stages]
+        return PipelineRun(outputs=outputs, timings=ordered, errors=errors)
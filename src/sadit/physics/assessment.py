@@ -0,0 +1,94 @@
+import threading
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from .materials import MaterialBioMatch
+from .stress import StressCalculator
+
+# Pain locations with their own column; any other location shares "other"
+PAIN_LOCATIONS = ("distal", "inguinal", "diffuse", "local", "other")
+
+
+class PhysicsAssessmentGrid:
+    """
+    [PRECOMPUTED PHYSICS]
+    Every StressCalculator assessment over (material, bone, pain location),
+    computed once from MaterialBioMatch.MATERIALS. Entries are read-only
+    mappings shared by all callers, so a lookup allocates nothing.
+    assess_batch() resolves a whole column of cases with one fancy-index
+    into the grid; the cost does not depend on the size of the material
+    table, which only affects the (one-off) build.
+    """
+
+    def __init__(self, materials: Mapping, revision: int = 0):
+        self.revision = revision
+        self.material_keys = tuple(materials)
+        self._material_index = {key: i for i, key in enumerate(self.material_keys)}
+        self._location_index = {loc: i for i, loc in enumerate(PAIN_LOCATIONS)}
+
+        moduli = np.array([materials[key].youngs_modulus_gpa for key in self.material_keys])
+        # mismatch[m, b]: implant stiffness / bone stiffness
+        self.mismatch = moduli[:, None] / moduli[None, :]
+
+        grid = np.empty(self.mismatch.shape + (len(PAIN_LOCATIONS),), dtype=object)
+        # Assessments depend on the ratio only through its rule thresholds:
+        # identical ones are built once and shared
+        shared = {}
+        for (m, b), ratio in np.ndenumerate(self.mismatch):
+            for l, location in enumerate(PAIN_LOCATIONS):
+                assessment = StressCalculator.assess_stress_conditions(float(ratio), location)
+                key = tuple(sorted(assessment.items()))
+                grid[m, b, l] = shared.setdefault(key, MappingProxyType(assessment))
+        self.grid = grid
+
+    def _material_indices(self, keys: Sequence[str]) -> np.ndarray:
+        try:
+            return np.fromiter((self._material_index[k] for k in keys), dtype=np.intp, count=len(keys))
+        except KeyError as e:
+            raise ValueError(f"Unknown material: {e.args[0]}") from None
+
+    def location_indices(self, locations: Sequence[str]) -> np.ndarray:
+        other = self._location_index["other"]
+        return np.fromiter((self._location_index.get(loc, other) for loc in locations),
+                           dtype=np.intp, count=len(locations))
+
+    def assess(self, material_key: str, pain_location: str,
+               bone_key: str = "cortical_bone") -> Mapping:
+        """Single-case lookup; same result as StressCalculator on the mismatch ratio."""
+        m, b = self._material_indices((material_key, bone_key))
+        return self.grid[m, b, self.location_indices((pain_location,))[0]]
+
+    def assess_batch(self, material_keys: Sequence[str], pain_locations: Sequence[str],
+                     bone_keys: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Assessments for a column of cases (object array of read-only
+        mappings). bone_keys defaults to cortical bone for every case.
+        """
+        if len(material_keys) != len(pain_locations):
+            raise ValueError("material_keys and pain_locations must have the same length")
+        m = self._material_indices(material_keys)
+        b = (np.full(len(m), self._material_indices(("cortical_bone",))[0]) if bone_keys is None
+             else self._material_indices(bone_keys))
+        return self.grid[m, b, self.location_indices(pain_locations)]
+
+
+_grid: Optional[PhysicsAssessmentGrid] = None
+_grid_lock = threading.Lock()
+
+
+def assessment_grid() -> PhysicsAssessmentGrid:
+    """The grid for the current material table (rebuilt after register_material)."""
+    global _grid
+    grid = _grid
+    if grid is None or grid.revision != MaterialBioMatch.revision:
+        with _grid_lock:
+            if _grid is None or _grid.revision != MaterialBioMatch.revision:
+                _grid = PhysicsAssessmentGrid(dict(MaterialBioMatch.MATERIALS), MaterialBioMatch.revision)
+            grid = _grid
+    return grid
+
+
+# Built at import: physics lookups never pay for it on the request path
+assessment_grid()
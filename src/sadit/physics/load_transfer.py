@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from .materials import MaterialBioMatch
+
+# Peak hip contact force during gait, ~3x body weight of 70 kg (Bergmann 2001)
+DEFAULT_HIP_LOAD_N = 2100.0
+
+
+@dataclass(frozen=True)
+class StemGeometry:
+    """Axisymmetric stem-in-femur geometry (mm); the key of cached factorizations."""
+    stem_length_mm: float = 140.0
+    stem_diameter_mm: float = 12.0
+    bone_outer_diameter_mm: float = 30.0
+    # Diaphysis modelled below the stem tip (Gruen zone 4)
+    distal_bone_mm: float = 60.0
+    # Interface stiffness per unit area (N/mm^3); bonded press-fit
+    interface_stiffness: float = 400.0
+    element_mm: float = 2.0
+
+    @property
+    def stem_area(self) -> float:
+        return np.pi * self.stem_diameter_mm ** 2 / 4
+
+    @property
+    def bone_area(self) -> float:
+        # Cortical tube around the (reamed) canal
+        return np.pi * (self.bone_outer_diameter_mm ** 2 - self.stem_diameter_mm ** 2) / 4
+
+
+@dataclass
+class LoadTransferResult:
+    load_n: float
+    # Element midpoints, 0 = proximal end of the stem
+    positions_mm: np.ndarray
+    stem_stress_mpa: np.ndarray  # compressive positive; 0 below the tip
+    bone_stress_mpa: np.ndarray
+    interface_shear_mpa: np.ndarray  # per stem node
+    # Gruen zone -> 1 - bone stress / intact bone stress (1 = fully shielded)
+    gruen_shielding: Dict[int, float]
+
+    def summary(self) -> dict:
+        return {
+            "load_n": self.load_n,
+            "gruen_shielding": dict(self.gruen_shielding),
+            "peak_stem_stress_mpa": float(self.stem_stress_mpa.max()),
+            "peak_interface_shear_mpa": float(np.abs(self.interface_shear_mpa).max()),
+        }
+
+
+class LoadTransferModel:
+    """
+    [FINITE ELEMENTS]
+    1D axisymmetric stem-bone load transfer: two axial bar chains (stem and
+    cortical bone) coupled node by node by interface springs, i.e. a bar on
+    an elastic foundation. The hip load enters the stem head; the bone is
+    fixed distally, below the stem tip.
+    The sparse stiffness matrix is factorized once (SuperLU); each load case
+    is then a back-substitution, and several load cases solve together as
+    columns of one right-hand side.
+    """
+
+    def __init__(self, geometry: StemGeometry, stem_modulus_gpa: float, bone_modulus_gpa: float):
+        g = geometry
+        self.geometry = g
+        n_stem = max(3, int(round(g.stem_length_mm / g.element_mm)))
+        h = g.stem_length_mm / n_stem
+        n_bone = n_stem + max(1, int(round(g.distal_bone_mm / h)))
+        self.h = h
+        self.n_stem, self.n_bone = n_stem, n_bone
+        self.stem_e, self.bone_e = stem_modulus_gpa * 1e3, bone_modulus_gpa * 1e3  # MPa
+
+        # DOFs: bone nodes 0..n_bone, then stem nodes 0..n_stem (node 0 proximal)
+        bone = np.arange(n_bone + 1)
+        stem = n_bone + 1 + np.arange(n_stem + 1)
+        rows, cols, vals = [], [], []
+
+        def bars(dofs, stiffness):
+            a, b = dofs[:-1], dofs[1:]
+            rows.extend([a, b, a, b])
+            cols.extend([a, b, b, a])
+            vals.extend([np.full(len(a), stiffness)] * 2 + [np.full(len(a), -stiffness)] * 2)
+
+        bars(bone, self.bone_e * g.bone_area / h)
+        bars(stem, self.stem_e * g.stem_area / h)
+        # Lumped interface springs (trapezoidal weights along the stem)
+        self.spring = g.interface_stiffness * np.pi * g.stem_diameter_mm * h * np.ones(n_stem + 1)
+        self.spring[[0, -1]] /= 2
+        a, b = stem, bone[:n_stem + 1]
+        rows.extend([a, b, a, b])
+        cols.extend([a, b, b, a])
+        vals.extend([self.spring, self.spring, -self.spring, -self.spring])
+
+        n = n_bone + 1 + n_stem + 1
+        K = sparse.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                              shape=(n, n)).tocsc()
+        # Distal bone node fixed
+        self._free = np.delete(np.arange(n), n_bone)
+        self._lu = splu(K[self._free][:, self._free])
+        self._n = n
+        self._load_dof = n_bone + 1  # stem head
+        self._bone, self._stem = bone, stem
+
+        self.positions_mm = (np.arange(n_bone) + 0.5) * h
+        thirds = np.minimum(np.arange(n_bone) * 3 // n_stem, 3)  # 0-2 along the stem, 3 below
+        # Gruen zones: 1/7 proximal, 2/6 middle, 3/5 distal third (lateral/medial
+        # coincide in the axisymmetric model), 4 below the tip
+        self._zones = {zone: thirds == third for third, zones in enumerate(((1, 7), (2, 6), (3, 5), (4,)))
+                       for zone in zones}
+
+    def displacements(self, loads_n: np.ndarray) -> np.ndarray:
+        """Nodal displacements (n_dof, n_cases) for axial head loads (N)."""
+        loads_n = np.atleast_1d(np.asarray(loads_n, dtype=float))
+        rhs = np.zeros((self._n, len(loads_n)))
+        rhs[self._load_dof] = loads_n  # +x is distal: the head load pushes the stem down
+        u = np.zeros_like(rhs)
+        u[self._free] = self._lu.solve(rhs[self._free])
+        return u
+
+    def solve(self, load_n: float = DEFAULT_HIP_LOAD_N) -> LoadTransferResult:
+        return self.solve_batch([load_n])[0]
+
+    def solve_batch(self, loads_n) -> list:
+        """One LoadTransferResult per load case, from a single multi-column solve."""
+        loads_n = np.atleast_1d(np.asarray(loads_n, dtype=float))
+        u = self.displacements(loads_n)
+        u_bone, u_stem = u[self._bone], u[self._stem]
+        # Compressive stress positive
+        bone_stress = -self.bone_e * np.diff(u_bone, axis=0) / self.h
+        stem_stress = np.zeros_like(bone_stress)
+        stem_stress[:self.n_stem] = -self.stem_e * np.diff(u_stem, axis=0) / self.h
+        shear = self.geometry.interface_stiffness * (u_stem - u_bone[:self.n_stem + 1])
+
+        results = []
+        for k, load in enumerate(loads_n):
+            intact = load / self.geometry.bone_area
+            shielding = {zone: float(1 - bone_stress[mask, k].mean() / intact) if intact else 0.0
+                         for zone, mask in sorted(self._zones.items())}
+            results.append(LoadTransferResult(
+                load_n=float(load), positions_mm=self.positions_mm,
+                stem_stress_mpa=stem_stress[:, k], bone_stress_mpa=bone_stress[:, k],
+                interface_shear_mpa=shear[:, k], gruen_shielding=shielding))
+        return results
+
+
+@lru_cache(maxsize=64)
+def _cached_model(geometry: StemGeometry, stem_modulus_gpa: float, bone_modulus_gpa: float):
+    return LoadTransferModel(geometry, stem_modulus_gpa, bone_modulus_gpa)
+
+
+def load_transfer_model(material_key: str, bone_key: str = "cortical_bone",
+                        geometry: StemGeometry = StemGeometry()) -> LoadTransferModel:
+    """Factorized model for an implant material/geometry (cached by moduli and geometry)."""
+    mat = MaterialBioMatch.MATERIALS.get(material_key)
+    bone = MaterialBioMatch.MATERIALS.get(bone_key)
+    if not mat or not bone:
+        raise ValueError(f"Unknown material: {material_key} or {bone_key}")
+    return _cached_model(geometry, mat.youngs_modulus_gpa, bone.youngs_modulus_gpa)
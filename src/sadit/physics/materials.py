@@ -21,6 +21,16 @@ class MaterialBioMatch:
         "cobalt_chrome": MaterialProperties("Co-Cr-Mo (Austin-Moore)", 220.0, 8.3, "Standard ASTM F75"),
         "stainless_steel": MaterialProperties("316L SS", 193.0, 8.0, "Standard ASTM F138")
     }
+    # Bumped on every change to MATERIALS (invalidates the assessment grid)
+    revision = 0
+
+    @classmethod
+    def register_material(cls, key: str, properties: MaterialProperties):
+        """Adds or replaces a material (custom alloys, porous coatings)."""
+        if properties.youngs_modulus_gpa <= 0:
+            raise ValueError(f"Young's modulus must be positive for {key}")
+        cls.MATERIALS[key] = properties
+        cls.revision += 1
 
     @staticmethod
     def calculate_stiffness_mismatch(material_key: str, bone_key: str = "cortical_bone") -> float:
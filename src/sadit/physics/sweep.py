@@ -0,0 +1,183 @@
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .load_transfer import DEFAULT_HIP_LOAD_N, LoadTransferModel, StemGeometry
+from .materials import MaterialBioMatch
+from .stress import StressCalculator
+
+# Gruen zones reported (5-7 mirror 3-1 in the axisymmetric model)
+SWEEP_ZONES = (1, 2, 3, 4)
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    """Full-factorial grid of an implant sweep (points in C order of the axes)."""
+    materials: Tuple[str, ...] = ("cobalt_chrome", "stainless_steel", "titanium_alloy")
+    stem_lengths_mm: Tuple[float, ...] = (100.0, 120.0, 140.0, 160.0)
+    stem_diameters_mm: Tuple[float, ...] = (10.0, 12.0, 14.0)
+    # Osteoporotic -> healthy cortical bone
+    bone_moduli_gpa: Tuple[float, ...] = (8.0, 12.0, 15.0, 18.0, 21.0)
+    load_n: float = DEFAULT_HIP_LOAD_N
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self.materials), len(self.stem_lengths_mm),
+                len(self.stem_diameters_mm), len(self.bone_moduli_gpa))
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def to_dict(self) -> dict:
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in asdict(self).items()}
+
+    def digest(self, material_moduli: Dict[str, float]) -> str:
+        # Includes the resolved moduli: editing a material invalidates old chunks
+        payload = json.dumps({"spec": self.to_dict(), "moduli": material_moduli}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def _run_chunk(spec: SweepSpec, material_moduli: Dict[str, float], start: int, stop: int) -> dict:
+    """Evaluates grid points [start, stop) (runs in a worker process)."""
+    m, l, d, b = np.unravel_index(np.arange(start, stop), spec.shape)
+    n = stop - start
+    columns = {
+        "material": np.asarray(spec.materials)[m],
+        "stem_length_mm": np.asarray(spec.stem_lengths_mm, dtype=float)[l],
+        "stem_diameter_mm": np.asarray(spec.stem_diameters_mm, dtype=float)[d],
+        "bone_modulus_gpa": np.asarray(spec.bone_moduli_gpa, dtype=float)[b],
+        "mismatch_ratio": np.empty(n),
+        "stress_shielding_risk": np.empty(n, dtype="U8"),
+        "tip_stress_risk": np.empty(n, dtype="U8"),
+        "peak_stem_stress_mpa": np.empty(n),
+        "peak_interface_shear_mpa": np.empty(n),
+    }
+    for zone in SWEEP_ZONES:
+        columns[f"shielding_zone_{zone}"] = np.empty(n)
+
+    for k in range(n):
+        stem_modulus = material_moduli[columns["material"][k]]
+        bone_modulus = columns["bone_modulus_gpa"][k]
+        ratio = stem_modulus / bone_modulus
+        rule = StressCalculator.assess_stress_conditions(ratio, "distal")
+        geometry = StemGeometry(stem_length_mm=columns["stem_length_mm"][k],
+                                stem_diameter_mm=columns["stem_diameter_mm"][k])
+        # Every point has its own geometry/moduli: one factorization each
+        summary = LoadTransferModel(geometry, stem_modulus, bone_modulus).solve(spec.load_n).summary()
+        columns["mismatch_ratio"][k] = ratio
+        columns["stress_shielding_risk"][k] = rule["stress_shielding_risk"]
+        columns["tip_stress_risk"][k] = rule["tip_stress_risk"]
+        columns["peak_stem_stress_mpa"][k] = summary["peak_stem_stress_mpa"]
+        columns["peak_interface_shear_mpa"][k] = summary["peak_interface_shear_mpa"]
+        for zone in SWEEP_ZONES:
+            columns[f"shielding_zone_{zone}"][k] = summary["gruen_shielding"][zone]
+    return columns
+
+
+class ImplantSweep:
+    """
+    [PARAMETRIC SWEEP]
+    Evaluates stress-shielding metrics (rule verdict + FE load transfer)
+    over a SweepSpec grid. The grid is split into fixed-size chunks that run
+    in worker processes; each finished chunk is streamed to
+    `out_dir/chunk_NNNNNN.npz` (atomic rename), so an interrupted sweep
+    resumes by skipping the chunks already on disk. A manifest pins the spec
+    and material moduli: resuming with a different grid is refused.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, out_dir: str, spec: SweepSpec = SweepSpec(), chunk_size: int = 64):
+        self.out_dir = out_dir
+        self.spec = spec
+        self.chunk_size = chunk_size
+        unknown = [k for k in spec.materials if k not in MaterialBioMatch.MATERIALS]
+        if unknown:
+            raise ValueError(f"Unknown materials: {unknown}")
+        # Resolved here: worker processes may not see runtime-registered materials
+        self.material_moduli = {k: MaterialBioMatch.MATERIALS[k].youngs_modulus_gpa for k in spec.materials}
+
+    @property
+    def n_chunks(self) -> int:
+        return -(-self.spec.size // self.chunk_size)
+
+    def _chunk_path(self, index: int) -> str:
+        return os.path.join(self.out_dir, f"chunk_{index:06d}.npz")
+
+    def _write_manifest(self):
+        manifest = {"spec": self.spec.to_dict(), "material_moduli": self.material_moduli,
+                    "digest": self.spec.digest(self.material_moduli),
+                    "chunk_size": self.chunk_size, "n_points": self.spec.size}
+        path = os.path.join(self.out_dir, self.MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                existing = json.load(f)
+            if (existing["digest"], existing["chunk_size"]) != (manifest["digest"], self.chunk_size):
+                raise ValueError(f"{self.out_dir} holds a different sweep; use a new directory")
+            return
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def pending_chunks(self) -> list:
+        return [i for i in range(self.n_chunks) if not os.path.exists(self._chunk_path(i))]
+
+    def _save_chunk(self, index: int, columns: dict):
+        tmp = self._chunk_path(index) + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, self._chunk_path(index))
+
+    def run(self, max_workers: Optional[int] = None) -> int:
+        """Runs the missing chunks; returns how many were computed."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._write_manifest()
+        pending = self.pending_chunks()
+
+        def bounds(i):
+            return i * self.chunk_size, min((i + 1) * self.chunk_size, self.spec.size)
+
+        if (max_workers or os.cpu_count() or 1) == 1 or len(pending) == 1:
+            for i in pending:
+                self._save_chunk(i, _run_chunk(self.spec, self.material_moduli, *bounds(i)))
+            return len(pending)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_run_chunk, self.spec, self.material_moduli, *bounds(i)): i
+                       for i in pending}
+            for future in as_completed(futures):
+                self._save_chunk(futures[future], future.result())
+        return len(pending)
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """Concatenated columns of the finished sweep (grid order)."""
+        pending = self.pending_chunks()
+        if pending:
+            raise RuntimeError(f"Sweep incomplete: {len(pending)} of {self.n_chunks} chunks missing")
+        chunks = []
+        for i in range(self.n_chunks):
+            with np.load(self._chunk_path(i)) as data:
+                chunks.append({k: data[k] for k in data.files})
+        return {k: np.concatenate([c[k] for c in chunks]) for k in chunks[0]}
+
+    def export(self, path: str) -> str:
+        """Writes the whole sweep as one .npz, or .parquet (requires pyarrow)."""
+        columns = self.load()
+        if path.endswith(".parquet"):
+            if pyarrow is None:
+                raise ImportError("Parquet export requires pyarrow (pip install pyarrow); use .npz")
+            pyarrow.parquet.write_table(pyarrow.table(columns), path)
+        else:
+            np.savez_compressed(path, **columns)
+        return path
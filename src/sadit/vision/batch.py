@@ -0,0 +1,185 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .dicom import DicomImage
+from .pyramid import ImagePyramid
+
+# (shared memory segment name, shape, dtype): all that crosses the process boundary
+ArrayRef = Tuple[str, Tuple[int, ...], str]
+
+# Emulators built in this worker process, by configuration
+_worker_emulators = {}
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, ArrayRef]:
+    """Copies `array` into a new shared memory segment (one memcpy, no pickling)."""
+    array = np.asarray(array)
+    segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _attach(ref: ArrayRef) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = ref
+    segment = shared_memory.SharedMemory(name=name)
+    return segment, np.ndarray(shape, np.dtype(dtype), buffer=segment.buf)
+
+
+def _emulator(config: tuple):
+    emulator = _worker_emulators.get(config)
+    if emulator is None:
+        from .cache import VisionCache
+        from .enhancement import CZTEnhancedEmulator
+        tile_size, workers, rl_tolerance, cache_root, cache_max_bytes = config
+        emulator = _worker_emulators[config] = CZTEnhancedEmulator(
+            tile_size=tile_size, workers=workers, rl_tolerance=rl_tolerance,
+            cache=VisionCache(cache_root, cache_max_bytes) if cache_root else None)
+    return emulator
+
+
+def _enrich_shared(config: tuple, source) -> ArrayRef:
+    """
+    Worker side: reads the image from shared memory (or loads the file),
+    enriches it and writes the result into a new segment owned by the
+    parent from then on. Only segment names travel back.
+    """
+    segment = None
+    if isinstance(source, tuple):
+        segment, image = _attach(source)
+    else:
+        from ..inference.orchestrator import load_image
+        image = load_image(source)
+    try:
+        enriched = _emulator(config).enrich_image(image)
+        output, ref = _share(enriched)
+        output.close()
+        return ref
+    finally:
+        del image
+        if segment is not None:
+            segment.close()
+
+
+class EnrichedBatch:
+    """
+    Results of enrich_batch, in input order: read-only views over shared
+    memory segments (None where that image failed; see `errors`). Valid
+    until close(); use as a context manager, or copy what must outlive it.
+    """
+
+    def __init__(self, size: int):
+        self._segments: List[Optional[shared_memory.SharedMemory]] = [None] * size
+        self._arrays: List[Optional[np.ndarray]] = [None] * size
+        self.errors: List[Optional[Exception]] = [None] * size
+
+    def _adopt(self, index: int, ref: ArrayRef):
+        segment, array = _attach(ref)
+        array.flags.writeable = False
+        self._segments[index], self._arrays[index] = segment, array
+
+    def __len__(self) -> int:
+        return len(self._arrays)
+
+    def __getitem__(self, index: int) -> Optional[np.ndarray]:
+        return self._arrays[index]
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self._arrays if a is not None)
+
+    def close(self):
+        self._arrays = [None] * len(self._arrays)
+        for i, segment in enumerate(self._segments):
+            _release(segment)
+            self._segments[i] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+def enrich_batch(emulator, images: Iterable, max_workers: Optional[int] = None,
+                 executor=None) -> EnrichedBatch:
+    """
+    [SHARED-MEMORY BATCH]
+    Enriches many images on a process pool (`executor`, or one of
+    `max_workers` processes created for the call) without pickling pixels:
+    arrays are copied once into shared memory, file paths (.npy, DICOM,
+    anything OpenCV reads) and DicomImages are loaded by the worker, and
+    each result comes back as a shared memory segment adopted by the
+    returned EnrichedBatch. At most 2 x max_workers inputs are staged in
+    shared memory at once. Each worker runs the emulator's configuration
+    with its thread budget split between the processes. A failing image
+    records its exception without aborting the batch.
+    """
+    images = list(images)
+    batch = EnrichedBatch(len(images))
+    max_workers = max_workers or getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+    cache = emulator.cache
+    config = (emulator.tile_size, max(1, emulator.workers // max_workers), emulator.deconvolver.tolerance,
+              cache.root if cache is not None else None, cache.max_bytes if cache is not None else None)
+
+    own_executor = None
+    if executor is None:
+        executor = own_executor = ProcessPoolExecutor(max_workers=max_workers)
+    pending = {}
+    try:
+        for index, image in enumerate(images):
+            if len(pending) >= 2 * max_workers:
+                _collect(batch, pending, wait(pending, return_when=FIRST_COMPLETED).done)
+            if isinstance(image, ImagePyramid):
+                image = image.full
+            segment = None
+            if isinstance(image, DicomImage):
+                source = image.path
+            elif isinstance(image, (str, os.PathLike)):
+                source = os.fspath(image)
+            else:
+                segment, source = _share(image)
+            pending[executor.submit(_enrich_shared, config, source)] = (index, segment)
+        _collect(batch, pending, list(pending))
+    except BaseException:
+        # Interrupted: results still in flight are adopted, then everything freed
+        for future in pending:
+            future.cancel()
+        _collect(batch, pending, list(pending))
+        batch.close()
+        raise
+    finally:
+        if own_executor is not None:
+            own_executor.shutdown()
+    return batch
+
+
+def _release(segment: Optional[shared_memory.SharedMemory]):
+    if segment is None:
+        return
+    try:
+        segment.close()
+    except BufferError:
+        pass  # a caller still holds a view: the mapping lives until it is dropped
+    segment.unlink()
+
+
+def _collect(batch: EnrichedBatch, pending: dict, done):
+    for future in done:
+        index, segment = pending.pop(future)
+        try:
+            batch._adopt(index, future.result())
+        except BaseException as e:
+            batch.errors[index] = e
+        finally:
+            # The worker has finished with the input
+            _release(segment)
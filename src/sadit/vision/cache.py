@@ -0,0 +1,164 @@
+try:
+    import fcntl
+except ImportError:  # Windows: eviction runs without the cross-process lock
+    fcntl = None
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+VISION_CACHE_DIR = os.getenv("SADIT_VISION_CACHE_DIR", os.path.join("data", "cache", "vision"))
+VISION_CACHE_MB = float(os.getenv("SADIT_VISION_CACHE_MB", "2048"))
+# Bump when a cached computation changes its output for the same parameters
+VISION_PIPELINE_VERSION = "1"
+
+
+def content_hash(image: np.ndarray, *parts) -> str:
+    """
+    SHA-256 of the pixel buffer, its shape/dtype and any extra key parts
+    (pipeline name, parameters...). Hardware-accelerated: ~1 GB/s.
+    """
+    image = np.ascontiguousarray(image)
+    digest = hashlib.sha256(json.dumps([str(image.shape), str(image.dtype)] + list(parts),
+                                       sort_keys=True, default=str).encode())
+    digest.update(memoryview(image).cast("B"))
+    return digest.hexdigest()
+
+
+class VisionCache:
+    """
+    [CONTENT-ADDRESSED CACHE]
+    On-disk store of enriched images (.npy, memory-mapped on read) and
+    derived features (.json), keyed by content_hash().
+    Writes go to a temporary file in the same directory and are published
+    with os.replace, so readers (any process) see whole entries or none.
+    A hit touches the entry's mtime; once the directory exceeds max_bytes,
+    the least recently used entries are deleted (under an flock shared by
+    all worker processes) down to 90% of the budget.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, root: str = VISION_CACHE_DIR, max_bytes: int = int(VISION_CACHE_MB * 1024 * 1024)):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        # Bytes written since the last size scan (scans are amortized)
+        self._written = 0
+        self._scanned_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def _read(self, key: str, suffix: str, loader):
+        path = self._path(key, suffix)
+        try:
+            value = loader(path)
+            os.utime(path)  # LRU clock
+        except (FileNotFoundError, ValueError, EOFError):
+            # Missing, evicted meanwhile or unreadable: a miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def _write(self, key: str, suffix: str, writer):
+        path = self._path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            self._written += os.path.getsize(path)
+            due = (self._scanned_bytes is None
+                   or self._scanned_bytes + self._written > self.max_bytes)
+        if due:
+            self.evict()
+
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        return self._read(key, ".npy", lambda path: np.load(path, mmap_mode="r"))
+
+    def put_array(self, key: str, array: np.ndarray):
+        self._write(key, ".npy", lambda f: np.save(f, np.ascontiguousarray(array)))
+
+    def get_json(self, key: str) -> Optional[dict]:
+        def load(path):
+            with open(path) as f:
+                return json.load(f)
+        return self._read(key, ".json", load)
+
+    def put_json(self, key: str, value: dict):
+        self._write(key, ".json", lambda f: f.write(json.dumps(value).encode()))
+
+    @contextmanager
+    def _exclusive(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _entries(self) -> list:
+        entries = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self) -> int:
+        """Deletes least recently used entries past the budget; returns the bytes kept."""
+        with self._exclusive():
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                target = self.max_bytes * self.LOW_WATER
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+        with self._lock:
+            self._scanned_bytes, self._written = total, 0
+        return total
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
+
+def default_vision_cache() -> Optional[VisionCache]:
+    """Cache under SADIT_VISION_CACHE_DIR; SADIT_VISION_CACHE_MB=0 disables it."""
+    return VisionCache() if VISION_CACHE_MB > 0 else None
@@ -0,0 +1,92 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import fft
+
+
+@lru_cache(maxsize=32)
+def gaussian_psf(shape: Tuple[int, int] = (5, 5), sigma: float = 1.0) -> np.ndarray:
+    """Normalized Gaussian PSF (float32, read-only: shared by every caller)."""
+    m, n = [(ss-1.)/2. for ss in shape]
+    y, x = np.ogrid[-m:m+1, -n:n+1]
+    h = np.exp(-(x*x + y*y) / (2.*sigma*sigma))
+    h[h < np.finfo(h.dtype).eps*h.max()] = 0
+    sumh = h.sum()
+    if sumh != 0:
+        h /= sumh
+    h = h.astype(np.float32)
+    h.flags.writeable = False
+    return h
+
+
+@lru_cache(maxsize=64)
+def _transfer_functions(psf_shape: Tuple[int, int], sigma: float, padded_shape: Tuple[int, int]):
+    # OTFs of the PSF and of its mirror on a zero-padded grid (linear convolution)
+    psf = gaussian_psf(psf_shape, sigma)
+    otf = fft.rfft2(psf, s=padded_shape)
+    otf_mirror = fft.rfft2(psf[::-1, ::-1], s=padded_shape)
+    otf.flags.writeable = otf_mirror.flags.writeable = False
+    return otf, otf_mirror
+
+
+class RichardsonLucyDeconvolver:
+    """
+    [FFT DECONVOLUTION]
+    Richardson-Lucy in the frequency domain, O(N log N) per iteration
+    instead of O(N k^2). Same result as skimage.restoration.richardson_lucy
+    (zero-padded 'same' convolutions, clipped to [-1, 1]).
+    The Gaussian PSF and its transforms are cached per (PSF shape, sigma,
+    padded image size); iterations reuse float32 buffers.
+    With `tolerance`, iterations stop once the relative L2 change of the
+    estimate falls below it.
+    """
+
+    def __init__(self, psf_shape: Tuple[int, int] = (5, 5), sigma: float = 1.0,
+                 num_iter: int = 15, tolerance: Optional[float] = None):
+        self.psf_shape = tuple(psf_shape)
+        self.sigma = float(sigma)
+        self.num_iter = num_iter
+        self.tolerance = tolerance
+        # Iterations run by the last deconvolve() call
+        self.last_iterations = 0
+
+    @property
+    def psf(self) -> np.ndarray:
+        return gaussian_psf(self.psf_shape, self.sigma)
+
+    def deconvolve(self, image: np.ndarray, clip: bool = True) -> np.ndarray:
+        image = np.asarray(image, dtype=np.float32)
+        height, width = image.shape
+        kh, kw = self.psf_shape
+        padded = (fft.next_fast_len(height + kh - 1, real=True),
+                  fft.next_fast_len(width + kw - 1, real=True))
+        otf, otf_mirror = _transfer_functions(self.psf_shape, self.sigma, padded)
+        # 'same' window of the full linear convolution
+        window = (slice((kh - 1) // 2, (kh - 1) // 2 + height),
+                  slice((kw - 1) // 2, (kw - 1) // 2 + width))
+
+        estimate = np.full(image.shape, 0.5, dtype=np.float32)
+        ratio = np.empty_like(estimate)
+        previous = np.empty_like(estimate) if self.tolerance is not None else None
+        eps = np.float32(1e-12)
+
+        self.last_iterations = 0
+        for _ in range(self.num_iter):
+            if previous is not None:
+                np.copyto(previous, estimate)
+            blurred = fft.irfft2(fft.rfft2(estimate, s=padded) * otf, s=padded)[window]
+            np.add(blurred, eps, out=ratio)
+            np.divide(image, ratio, out=ratio)
+            correction = fft.irfft2(fft.rfft2(ratio, s=padded) * otf_mirror, s=padded)[window]
+            np.multiply(estimate, correction, out=estimate)
+            self.last_iterations += 1
+
+            if previous is not None:
+                np.subtract(estimate, previous, out=previous)
+                if np.linalg.norm(previous) <= self.tolerance * np.linalg.norm(estimate):
+                    break
+
+        if clip:
+            np.clip(estimate, -1, 1, out=estimate)
+        return estimate
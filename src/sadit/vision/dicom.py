@@ -0,0 +1,173 @@
+try:
+    import pydicom
+    import pydicom.pixels
+except ImportError:
+    pydicom = None
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Elements larger than this are not read with the header (i.e. PixelData)
+_DEFER_SIZE = 4096
+
+
+def _first(value):
+    # Multi-valued window attributes: the first pair is the default
+    if value is None:
+        return None
+    try:
+        return float(value[0])
+    except TypeError:
+        return float(value)
+
+
+@dataclass(frozen=True)
+class DicomHeader:
+    rows: int
+    columns: int
+    n_frames: int
+    samples_per_pixel: int
+    bits_allocated: int
+    bits_stored: int
+    pixel_representation: int  # 0 unsigned, 1 signed
+    photometric: str
+    transfer_syntax: str
+    modality: Optional[str]
+    rescale_slope: float
+    rescale_intercept: float
+    window_center: Optional[float]
+    window_width: Optional[float]
+    # (row, column) spacing in mm from PixelSpacing / ImagerPixelSpacing
+    pixel_spacing: Optional[Tuple[float, float]]
+
+    @property
+    def frame_shape(self) -> tuple:
+        return ((self.rows, self.columns) if self.samples_per_pixel == 1
+                else (self.rows, self.columns, self.samples_per_pixel))
+
+
+class DicomImage:
+    """
+    [LAZY DICOM]
+    Header read eagerly, pixel data on demand. For uncompressed little-endian
+    transfer syntaxes the frames are memory-mapped straight from the file
+    (no read until pixels are touched); encapsulated (compressed) data is
+    decoded one frame at a time by pydicom. Multi-frame objects are
+    accessed frame by frame.
+    Display conversion (modality rescale, then VOI window, then [0, 1]) is
+    done in float32 into a single output buffer.
+    """
+
+    def __init__(self, path: str):
+        if pydicom is None:
+            raise ImportError("DICOM support requires pydicom (pip install pydicom)")
+        self.path = str(path)
+        ds = pydicom.dcmread(self.path, defer_size=_DEFER_SIZE)
+        if "PixelData" not in ds:
+            raise ValueError(f"{path} has no pixel data")
+        syntax = ds.file_meta.TransferSyntaxUID
+        spacing = ds.get("PixelSpacing") or ds.get("ImagerPixelSpacing")
+        self.header = DicomHeader(
+            rows=int(ds.Rows), columns=int(ds.Columns),
+            n_frames=int(ds.get("NumberOfFrames", 1) or 1),
+            samples_per_pixel=int(ds.get("SamplesPerPixel", 1)),
+            bits_allocated=int(ds.BitsAllocated),
+            bits_stored=int(ds.get("BitsStored", ds.BitsAllocated)),
+            pixel_representation=int(ds.get("PixelRepresentation", 0)),
+            photometric=str(ds.get("PhotometricInterpretation", "MONOCHROME2")),
+            transfer_syntax=str(syntax), modality=ds.get("Modality"),
+            rescale_slope=float(ds.get("RescaleSlope", 1.0) or 1.0),
+            rescale_intercept=float(ds.get("RescaleIntercept", 0.0) or 0.0),
+            window_center=_first(ds.get("WindowCenter")),
+            window_width=_first(ds.get("WindowWidth")),
+            pixel_spacing=(float(spacing[0]), float(spacing[1])) if spacing else None)
+
+        h = self.header
+        self._offset = None
+        if (not syntax.is_encapsulated and syntax.is_little_endian
+                and h.bits_allocated in (8, 16, 32)
+                and (h.bits_stored == h.bits_allocated or h.pixel_representation == 0)):
+            # File offset of the PixelData value (deferred, so never read)
+            self._offset = ds.get_item("PixelData", keep_deferred=True).value_tell
+            self._dtype = np.dtype(f"{'i' if h.pixel_representation else 'u'}{h.bits_allocated // 8}").newbyteorder("<")
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self._offset is not None
+
+    def __len__(self) -> int:
+        return self.header.n_frames
+
+    def raw_frame(self, index: int = 0) -> np.ndarray:
+        """Stored values of one frame: a read-only memmap when possible."""
+        h = self.header
+        if not 0 <= index < h.n_frames:
+            raise IndexError(f"Frame {index} out of range ({h.n_frames} frames)")
+        if self._offset is None:
+            return pydicom.pixels.pixel_array(self.path, index=index)
+        frame_bytes = int(np.prod(h.frame_shape)) * self._dtype.itemsize
+        frame = np.memmap(self.path, dtype=self._dtype, mode="r",
+                          offset=self._offset + index * frame_bytes, shape=h.frame_shape)
+        return frame
+
+    def frames(self, display: bool = True) -> Iterator[np.ndarray]:
+        for index in range(len(self)):
+            yield self.frame(index) if display else self.raw_frame(index)
+
+    def modality_frame(self, index: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rescaled values (slope * stored + intercept) as float32."""
+        h = self.header
+        raw = self.raw_frame(index)
+        out = np.empty(raw.shape, dtype=np.float32) if out is None else out
+        if h.bits_stored < h.bits_allocated and self._offset is not None:
+            # Unused high bits (e.g. overlays in 12-of-16 bit data) are masked
+            np.bitwise_and(raw, (1 << h.bits_stored) - 1, out=out, casting="unsafe")
+        else:
+            np.copyto(out, raw, casting="unsafe")
+        if h.rescale_slope != 1.0:
+            out *= np.float32(h.rescale_slope)
+        if h.rescale_intercept != 0.0:
+            out += np.float32(h.rescale_intercept)
+        return out
+
+    def frame(self, index: int = 0, window: Optional[Tuple[float, float]] = None,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Display-ready float32 frame in [0, 1]: modality rescale, then the
+        linear VOI window (DICOM PS3.3 C.11.2.1.2; `window` = (center,
+        width) overrides the header) or min/max scaling when there is none.
+        MONOCHROME1 is inverted. All steps run in place in one buffer.
+        """
+        h = self.header
+        out = self.modality_frame(index, out)
+        center, width = window or (h.window_center, h.window_width)
+        if center is not None and width is not None and width >= 1:
+            if width > 1:
+                out -= np.float32(center - 0.5)
+                out /= np.float32(width - 1)
+                out += np.float32(0.5)
+            else:
+                np.greater(out, center - 0.5, out=out, casting="unsafe")
+        else:
+            low, high = float(out.min()), float(out.max())
+            out -= np.float32(low)
+            if high > low:
+                out /= np.float32(high - low)
+        np.clip(out, 0.0, 1.0, out=out)
+        if h.photometric == "MONOCHROME1":
+            np.subtract(np.float32(1.0), out, out=out)
+        return out
+
+
+def is_dicom(path) -> bool:
+    """DICOM Part 10 file (by extension or the 'DICM' preamble marker)."""
+    path = str(path)
+    if path.lower().endswith((".dcm", ".dicom")):
+        return True
+    try:
+        with open(path, "rb") as f:
+            f.seek(128)
+            return f.read(4) == b"DICM"
+    except OSError:
+        return False
@@ -1,6 +1,19 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import numpy as np
 import cv2
-from skimage import restoration, exposure
+from skimage import exposure
+from skimage.restoration import denoise_nl_means, estimate_sigma
+
+from .cache import VISION_PIPELINE_VERSION, VisionCache, content_hash
+from .deconvolution import RichardsonLucyDeconvolver, gaussian_psf
+from .dicom import DicomImage
+from .pyramid import ImagePyramid
+
+# Longer side of the enrichment preview (sub-second on one core)
+PREVIEW_MAX_SIDE = 512
 
 
 class CZTEnhancedEmulator:
@@ -9,49 +22,155 @@ class CZTEnhancedEmulator:
     by applying advanced image restoration techniques to standard radiographic/scintigraphic data.
     """
 
-    def __init__(self):
+    # Restoration parameters (they also bound how far a pixel's influence spreads)
+    NLM_PATCH_SIZE = 5
+    NLM_PATCH_DISTANCE = 6
+    RL_ITERATIONS = 15
+    PSF_SHAPE = (5, 5)
+    PSF_SIGMA = 1.0
+    CLAHE_CLIP_LIMIT = 0.03
+
+    def __init__(self, tile_size: Optional[int] = 512, workers: Optional[int] = None,
+                 rl_tolerance: Optional[float] = None, cache: Optional[VisionCache] = None):
         # CZT detectors have better energy resolution, effectively seeing less 'scatter'
         # and sharper edges than NaI crystals.
-        pass
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        # Estimated PSF of a standard collimator (Gaussian approx), FFT cached.
+        # rl_tolerance enables early stopping (RL_ITERATIONS is then a cap);
+        # tiles may stop at different iterations, so leave it unset when the
+        # tiled output must match the untiled one.
+        self.deconvolver = RichardsonLucyDeconvolver(self.PSF_SHAPE, self.PSF_SIGMA,
+                                                     self.RL_ITERATIONS, rl_tolerance)
+        # Enriched images by content hash (shared on disk across workers)
+        self.cache = cache
 
-    def enrich_image(self, image_array: np.ndarray) -> np.ndarray:
+    @property
+    def halo(self) -> int:
+        """
+        Context each tile needs around its core: the NLM search window plus
+        the PSF radius twice per Richardson-Lucy iteration (one convolution
+        forward, one with the mirrored PSF).
+        """
+        return (self.NLM_PATCH_SIZE // 2 + self.NLM_PATCH_DISTANCE
+                + 2 * self.RL_ITERATIONS * (self.PSF_SHAPE[0] // 2))
+
+    def enrich_image(self, image_array: np.ndarray, tile_size: Optional[int] = None,
+                     workers: Optional[int] = None) -> np.ndarray:
         """
         pipeline:
         1. Denoise (Preserve Edges)
         2. Deconvolution (Recover Resolution / simulate CZT PSF)
         3. CLAHE (Simulate high contrast / scatter rejection)
+
+        [TILED EXECUTION]
+        Steps 1-2 are local, so large images run them per tile (tile_size
+        core + halo of context) on a thread pool of `workers`; the kernels
+        release the GIL. Halos make the result seam-free and match the
+        untiled output within float32 tolerance. Noise estimation and CLAHE
+        stay global (their statistics span the whole image). Everything is
+        float32. tile_size=None (or workers=1) runs untiled.
+
+        [CACHED]
+        With a cache, the result is keyed by the normalized pixels and the
+        restoration parameters (tiling excluded: it does not change the
+        output beyond float32 tolerance); a repeat returns the stored image
+        as a read-only memory map.
         """
-        # Ensure image is normalized float 0-1
-        img_float = image_array.astype(np.float32)
-        if img_float.max() > 1.0:
-            img_float /= img_float.max()
+        if isinstance(image_array, ImagePyramid):
+            image_array = image_array.full
+        tile_size = self.tile_size if tile_size is None else tile_size
+        workers = workers or self.workers
+
+        if isinstance(image_array, DicomImage):
+            # Windowed display frame: float32 in [0, 1], built in its own buffer
+            img_float = image_array.frame(0)
+        else:
+            # Ensure image is normalized float 0-1
+            img_float = image_array.astype(np.float32)
+            if img_float.max() > 1.0:
+                img_float /= img_float.max()
+
+        key = None
+        if self.cache is not None:
+            key = content_hash(img_float, "czt_enrich", VISION_PIPELINE_VERSION, self.parameters)
+            cached = self.cache.get_array(key)
+            if cached is not None:
+                return cached
+
+        # Noise level of the whole image (shared by every tile)
+        sigma_est = float(np.mean(estimate_sigma(img_float)))
 
+        if (tile_size and workers > 1 and img_float.ndim == 2
+                and max(img_float.shape) > tile_size + 2 * self.halo):
+            restored = self._restore_tiled(img_float, sigma_est, tile_size, workers)
+        else:
+            restored = self._restore(img_float, sigma_est)
+
+        # 3. Scatter Rejection Simulation (CLAHE)
+        # CZT rejects scatter better, leading to higher local contrast
+        enhanced = exposure.equalize_adapthist(restored, clip_limit=self.CLAHE_CLIP_LIMIT)
+
+        enhanced = enhanced.astype(np.float32, copy=False)
+        if key is not None:
+            self.cache.put_array(key, enhanced)
+        return enhanced
+
+    def enrich_batch(self, images, max_workers: Optional[int] = None, executor=None):
+        """
+        enrich_image over many images (arrays, pyramids, DicomImages or
+        paths) on a process pool, with pixels passed through shared memory
+        instead of pickles. Returns an EnrichedBatch (see vision.batch).
+        """
+        from .batch import enrich_batch
+        return enrich_batch(self, images, max_workers=max_workers, executor=executor)
+
+    @property
+    def parameters(self) -> dict:
+        """Everything that determines the enriched output (the cache key)."""
+        return {"nlm_patch_size": self.NLM_PATCH_SIZE, "nlm_patch_distance": self.NLM_PATCH_DISTANCE,
+                "rl_iterations": self.RL_ITERATIONS, "rl_tolerance": self.deconvolver.tolerance,
+                "psf_shape": list(self.PSF_SHAPE), "psf_sigma": self.PSF_SIGMA,
+                "clahe_clip_limit": self.CLAHE_CLIP_LIMIT}
+
+    def enrich_preview(self, image_array, max_side: int = PREVIEW_MAX_SIDE) -> np.ndarray:
+        """
+        Same pipeline on the finest pyramid level that fits in max_side: a
+        quick preview while the full-resolution result is computed.
+        """
+        pyramid = ImagePyramid.build(image_array)
+        return self.enrich_image(pyramid.levels[pyramid.level_for(max_side)], tile_size=None)
+
+    def _restore(self, img_float: np.ndarray, sigma_est: float) -> np.ndarray:
         # 1. Denoise using Non-local Means (simulating direct conversion low noise)
-        # Using fastNlMeansDenoising from OpenCV (converted to uint8 for compat or use skimage)
-        # We'll use skimage for float support
-        from skimage.restoration import denoise_nl_means, estimate_sigma
-        sigma_est = np.mean(estimate_sigma(img_float))
         denoised = denoise_nl_means(img_float, h=1.15*sigma_est, fast_mode=True,
-                                    patch_size=5, patch_distance=6)
+                                    patch_size=self.NLM_PATCH_SIZE,
+                                    patch_distance=self.NLM_PATCH_DISTANCE)
 
         # 2. Resolution Recovery (Richardson-Lucy Deconvolution)
         # Simulating the removal of the "blur" from a standard Gamma Camera (NaI)
-        # Estimated PSF of a standard collimator (Gaussian approx)
-        psf = self._generate_gaussian_psf(shape=(5, 5), sigma=1.0)
-        deconvolved = restoration.richardson_lucy(denoised, psf, num_iter=15)
+        return self.deconvolver.deconvolve(denoised)
 
-        # 3. Scatter Rejection Simulation (CLAHE)
-        # CZT rejects scatter better, leading to higher local contrast
-        enhanced = exposure.equalize_adapthist(deconvolved, clip_limit=0.03)
+    def _restore_tiled(self, img_float: np.ndarray, sigma_est: float,
+                       tile_size: int, workers: int) -> np.ndarray:
+        height, width = img_float.shape
+        halo = self.halo
+        out = np.empty_like(img_float)
 
-        return enhanced
+        def run_tile(y0, x0):
+            y1, x1 = min(y0 + tile_size, height), min(x0 + tile_size, width)
+            # Tile plus halo, cropped at the image border (as the untiled run sees it)
+            ty0, tx0 = max(0, y0 - halo), max(0, x0 - halo)
+            ty1, tx1 = min(height, y1 + halo), min(width, x1 + halo)
+            restored = self._restore(img_float[ty0:ty1, tx0:tx1], sigma_est)
+            out[y0:y1, x0:x1] = restored[y0 - ty0:y1 - ty0, x0 - tx0:x1 - tx0]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="czt-tile") as executor:
+            futures = [executor.submit(run_tile, y0, x0)
+                       for y0 in range(0, height, tile_size) for x0 in range(0, width, tile_size)]
+            for future in futures:
+                future.result()
+        return out
 
     def _generate_gaussian_psf(self, shape=(5, 5), sigma=1):
-        m, n = [(ss-1.)/2. for ss in shape]
-        y, x = np.ogrid[-m:m+1, -n:n+1]
-        h = np.exp(-(x*x + y*y) / (2.*sigma*sigma))
-        h[h < np.finfo(h.dtype).eps*h.max()] = 0
-        sumh = h.sum()
-        if sumh != 0:
-            h /= sumh
-        return h
+        return gaussian_psf(tuple(shape), float(sigma)).copy()
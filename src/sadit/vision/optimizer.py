@@ -1,6 +1,29 @@
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
 import numpy as np
-# In a real scenario, we would import cv2 here.
-# import cv2
+import cv2
+
+from .cache import VISION_PIPELINE_VERSION, VisionCache, content_hash
+from .dicom import DicomImage
+from .pyramid import ImagePyramid
+from .texture import TextureMapEngine
+
+# Calibrations kept per process (keyed by image content hash)
+CALIBRATION_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class HeadDetection:
+    """Prosthetic head found by calibrar_anatomicamente (full-resolution pixels)."""
+    center: Tuple[float, float]  # (y, x)
+    radius_px: float
+    # Fraction of the circle's perimeter backed by a radial intensity edge
+    # (0 = no detection: the legacy 120 px radius was assumed)
+    confidence: float
+    pixel_spacing: float  # mm/pixel
 
 
 class VisionHeuristicOptimizer:
@@ -11,6 +34,23 @@ class VisionHeuristicOptimizer:
 
     # Average Austin-Moore Prosthesis Head Diameter (mm)
     AUSTIN_MOORE_HEAD_MM = 48.0  # Standard size reference
+    # Radius assumed when no head is found (approx size in 1024x1024 xray)
+    FALLBACK_RADIUS_PX = 120
+    # Longer side of the coarse search image
+    COARSE_MAX_SIDE = 256
+    # Plausible head radius, as a fraction of the image's shorter side
+    HEAD_RADIUS_RANGE = (0.04, 0.3)
+    # Below this edge support a candidate is rejected (fallback radius)
+    MIN_CONFIDENCE = 0.3
+    # Longer side of the level the Gruen zone texture maps are computed on
+    TEXTURE_MAX_SIDE = 1024
+
+    _calibrations: "OrderedDict[str, HeadDetection]" = OrderedDict()
+    _calibrations_lock = threading.Lock()
+
+    def __init__(self, cache: Optional[VisionCache] = None):
+        # Head detections and texture features by content hash, on disk
+        self.cache = cache
 
     def calibrar_anatomicamente(self, image_array: np.ndarray) -> float:
         """
@@ -18,17 +58,122 @@ class VisionHeuristicOptimizer:
         Calibrates scale using the known diameter of the Austin-Moore Prosthesis Head.
         Logic: Finds the prosthetic head (bright circle) and equates its pixel width to ~48mm.
 
+        A DicomImage whose header carries PixelSpacing (or
+        ImagerPixelSpacing) is calibrated by the header: no detection runs.
+
         Returns:
             pixel_spacing (mm/pixel)
         """
-        # Placeholder for Hough Circle Transform logic
-        # For simulation: detected_radius_pixels = 120 (approx size in 1024x1024 xray)
-        detected_radius_pixels = 120
+        if isinstance(image_array, DicomImage) and image_array.header.pixel_spacing:
+            return float(np.mean(image_array.header.pixel_spacing))
+        return self.detect_prosthetic_head(image_array).pixel_spacing
+
+    def detect_prosthetic_head(self, image_array) -> HeadDetection:
+        """
+        [COARSE-TO-FINE HOUGH]
+        1. Circle Hough on the image downsampled to COARSE_MAX_SIDE: candidate.
+        2. Hough again on a full-resolution window around the candidate, with
+           the radius constrained to +/-15%: precise center and radius.
+        3. Confidence: share of the perimeter with a radial edge.
+        Results are cached by image content hash (in memory, and on disk
+        with a VisionCache). No candidate (or one below
+        MIN_CONFIDENCE) -> the legacy 120 px radius with confidence 0.
+        """
+        if isinstance(image_array, DicomImage):
+            image_array = image_array.frame(0)
+        pyramid = image_array if isinstance(image_array, ImagePyramid) else None
+        image = np.ascontiguousarray(pyramid.full if pyramid is not None else image_array)
+        key = content_hash(image, "prosthetic_head", VISION_PIPELINE_VERSION, self._detection_parameters())
+        with self._calibrations_lock:
+            cached = self._calibrations.get(key)
+            if cached is not None:
+                self._calibrations.move_to_end(key)
+                return cached
+
+        stored = self.cache.get_json(key) if self.cache is not None else None
+        if stored is not None:
+            detection = HeadDetection(**{**stored, "center": tuple(stored["center"])})
+        else:
+            detection = self._detect_head(image, pyramid)
+            if self.cache is not None:
+                self.cache.put_json(key, asdict(detection))
+        with self._calibrations_lock:
+            self._calibrations[key] = detection
+            while len(self._calibrations) > CALIBRATION_CACHE_SIZE:
+                self._calibrations.popitem(last=False)
+        return detection
+
+    def _detection_parameters(self) -> dict:
+        return {"head_mm": self.AUSTIN_MOORE_HEAD_MM, "fallback_px": self.FALLBACK_RADIUS_PX,
+                "coarse_max_side": self.COARSE_MAX_SIDE, "radius_range": list(self.HEAD_RADIUS_RANGE),
+                "min_confidence": self.MIN_CONFIDENCE}
+
+    def _head(self, center, radius_px: float, confidence: float) -> HeadDetection:
+        return HeadDetection(center=center, radius_px=float(radius_px), confidence=float(confidence),
+                             pixel_spacing=float(self.AUSTIN_MOORE_HEAD_MM / (2 * radius_px)))
 
-        diameter_pixels = detected_radius_pixels * 2
-        pixel_spacing = self.AUSTIN_MOORE_HEAD_MM / diameter_pixels
+    @staticmethod
+    def _to_uint8(image: np.ndarray) -> np.ndarray:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image.astype(np.float32), cv2.COLOR_BGR2GRAY)
+        return cv2.normalize(image.astype(np.float32), None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
 
-        return pixel_spacing
+    def _detect_head(self, image: np.ndarray, pyramid: Optional[ImagePyramid]) -> HeadDetection:
+        height, width = image.shape[:2]
+        fallback = self._head((height / 2, width / 2), self.FALLBACK_RADIUS_PX, 0.0)
+        if image.ndim not in (2, 3) or min(height, width) < 32 or np.ptp(image) == 0:
+            return fallback
+
+        # 1. Coarse candidate
+        if pyramid is not None:
+            coarse = pyramid.levels[pyramid.level_for(self.COARSE_MAX_SIDE)]
+        else:
+            factor = self.COARSE_MAX_SIDE / max(height, width)
+            coarse = image if factor >= 1 else cv2.resize(
+                image.astype(np.float32), (max(1, round(width * factor)), max(1, round(height * factor))),
+                interpolation=cv2.INTER_AREA)
+        scale = height / coarse.shape[0]
+        coarse8 = cv2.GaussianBlur(self._to_uint8(coarse), (5, 5), 1.0)
+        short = min(coarse8.shape[:2])
+        circles = cv2.HoughCircles(coarse8, cv2.HOUGH_GRADIENT, dp=1, minDist=short,
+                                   param1=100, param2=20,
+                                   minRadius=max(3, int(short * self.HEAD_RADIUS_RANGE[0])),
+                                   maxRadius=int(short * self.HEAD_RADIUS_RANGE[1]))
+        if circles is None:
+            return fallback
+        cx, cy, r = circles[0, 0] * scale
+
+        # 2. Refinement in a full-resolution window around the candidate
+        margin = int(1.3 * r + 2 * scale)
+        y0, x0 = max(0, int(cy) - margin), max(0, int(cx) - margin)
+        y1, x1 = min(height, int(cy) + margin), min(width, int(cx) + margin)
+        window = cv2.GaussianBlur(self._to_uint8(image[y0:y1, x0:x1]), (5, 5), 1.5)
+        refined = cv2.HoughCircles(window, cv2.HOUGH_GRADIENT, dp=1, minDist=max(window.shape),
+                                   param1=100, param2=30,
+                                   minRadius=int(0.85 * r), maxRadius=int(np.ceil(1.15 * r)))
+        if refined is not None:
+            rx, ry, r = refined[0, 0]
+            cx, cy = rx + x0, ry + y0
+
+        # 3. Confidence from edge support along the perimeter
+        confidence = self._edge_support(window, (cy - y0, cx - x0), r)
+        if confidence < self.MIN_CONFIDENCE:
+            return fallback
+        return self._head((float(cy), float(cx)), r, confidence)
+
+    @staticmethod
+    def _edge_support(window: np.ndarray, center, radius: float, samples: int = 180) -> float:
+        gy = cv2.Sobel(window, cv2.CV_32F, 0, 1, ksize=3)
+        gx = cv2.Sobel(window, cv2.CV_32F, 1, 0, ksize=3)
+        magnitude = np.hypot(gx, gy)
+        threshold = magnitude.mean() + magnitude.std()
+        theta = np.linspace(0, 2 * np.pi, samples, endpoint=False)
+        ys = np.clip(np.round(center[0] + radius * np.sin(theta)).astype(int), 0, window.shape[0] - 1)
+        xs = np.clip(np.round(center[1] + radius * np.cos(theta)).astype(int), 0, window.shape[1] - 1)
+        g = magnitude[ys, xs]
+        # Radial alignment: |cos| between the gradient and the circle normal
+        cos = np.abs(gx[ys, xs] * np.cos(theta) + gy[ys, xs] * np.sin(theta)) / np.maximum(g, 1e-6)
+        return float(np.mean((g > threshold) & (cos > np.cos(np.pi / 6))))
 
     def analyze_texture_roughness(self, roi: np.ndarray) -> float:
         """
@@ -36,3 +181,96 @@ class VisionHeuristicOptimizer:
         Higher variance/entropy suggests heterogeneity (lysis).
         """
         return np.var(roi)
+
+    def find_texture_rois(self, pyramid: ImagePyramid, top_k: int = 4, block: int = 16,
+                          max_side: int = 512) -> list:
+        """
+        [COARSE-TO-FINE]
+        Detects the most heterogeneous regions on a coarse pyramid level
+        (local variance over `block`-pixel cells, via box filters) and returns
+        their bounding boxes (y0, x0, y1, x1) at full resolution.
+        """
+        level = pyramid.level_for(max_side)
+        image = pyramid.levels[level]
+        mean = cv2.blur(image, (block, block))
+        local_var = cv2.blur(image * image, (block, block)) - mean * mean
+        cells = local_var[block // 2::block, block // 2::block]
+        top_k = min(top_k, cells.size)
+        best = np.argpartition(cells.ravel(), -top_k)[-top_k:]
+        best = best[np.argsort(cells.ravel()[best])[::-1]]
+        rows, cols = np.unravel_index(best, cells.shape)
+        return [pyramid.to_full_resolution((r * block, c * block, (r + 1) * block, (c + 1) * block), level)
+                for r, c in zip(rows, cols)]
+
+    def analyze_texture_pyramid(self, pyramid: ImagePyramid, top_k: int = 4) -> dict:
+        """
+        Texture roughness refined at full resolution only inside the regions
+        of interest found on the coarse level. Cached by content hash with
+        a VisionCache.
+        """
+        key = None
+        if self.cache is not None:
+            key = content_hash(pyramid.full, "texture_pyramid", VISION_PIPELINE_VERSION,
+                               {"top_k": top_k, "depth": pyramid.depth})
+            cached = self.cache.get_json(key)
+            if cached is not None:
+                return {**cached, "regions": [{**r, "box": tuple(r["box"])} for r in cached["regions"]]}
+        regions = [{"box": tuple(int(v) for v in box),
+                    "roughness": float(self.analyze_texture_roughness(
+                        pyramid.full[box[0]:box[2], box[1]:box[3]]))}
+                   for box in self.find_texture_rois(pyramid, top_k=top_k)]
+        texture = {"texture_roughness": max((r["roughness"] for r in regions), default=0.0),
+                   "regions": regions}
+        if key is not None:
+            self.cache.put_json(key, texture)
+        return texture
+
+    def analyze_gruen_zones(self, image_array, max_side: int = TEXTURE_MAX_SIDE,
+                            engine: Optional[TextureMapEngine] = None) -> dict:
+        """
+        [GRUEN ZONES]
+        Periprosthetic texture per Gruen zone: the head is detected at full
+        resolution, then the stem axis, the texture maps (integral images)
+        and the zone bands are computed on the pyramid level fitting
+        max_side. Returns the stem (full-resolution pixels) and, per zone,
+        mean variance, entropy, gradient energy and osteolysis score; no
+        stem found (or no head detected) -> stem None and no zones. A
+        DicomImage with PixelSpacing in its header is calibrated by the
+        header, as in calibrar_anatomicamente.
+        """
+        engine = engine or TextureMapEngine()
+        header_spacing = None
+        if isinstance(image_array, DicomImage):
+            if image_array.header.pixel_spacing:
+                header_spacing = float(np.mean(image_array.header.pixel_spacing))
+            image_array = image_array.frame(0)
+        pyramid = ImagePyramid.build(image_array)
+        level = pyramid.level_for(max_side)
+        key = None
+        if self.cache is not None:
+            key = content_hash(pyramid.full, "gruen_zones", VISION_PIPELINE_VERSION,
+                               {"level": level, "window": engine.window, "bins": engine.bins,
+                                "margin_mm": engine.ZONE_MARGIN_MM, "header_spacing": header_spacing,
+                                **self._detection_parameters()})
+            cached = self.cache.get_json(key)
+            if cached is not None:
+                return cached
+
+        head = self.detect_prosthetic_head(pyramid)
+        spacing = header_spacing or head.pixel_spacing
+        result = {"stem": None, "zones": {}, "level": level, "pixel_spacing": spacing}
+        if head.confidence > 0:
+            image, scale = pyramid.levels[level], pyramid.scale(level)
+            center, radius = (head.center[0] / scale, head.center[1] / scale), head.radius_px / scale
+            metal = engine.segment_metal(image, center, radius)
+            stem = engine.find_stem(metal, center, radius) if metal is not None else None
+            if stem is not None:
+                maps = engine.compute(image)
+                labels = engine.gruen_zone_labels(image.shape, stem, engine.ZONE_MARGIN_MM / (spacing * scale), metal)
+                result["zones"] = engine.aggregate(maps, labels)
+                result["stem"] = {"origin": [v * scale for v in stem.origin], "direction": list(stem.direction),
+                                  "length_px": stem.length_px * scale, "half_width_px": stem.half_width_px * scale,
+                                  "medial_sign": stem.medial_sign}
+        if key is not None:
+            self.cache.put_json(key, result)
+        return result
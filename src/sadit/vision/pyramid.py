@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from .dicom import DicomImage
+
+# Coarsest level: the pyramid stops once the longer side would fall below this
+PYRAMID_MIN_SIDE = 128
+
+
+@dataclass
+class ImagePyramid:
+    """
+    [MULTI-RESOLUTION]
+    Gaussian pyramid of an image: level 0 is the original (float32), each
+    further level is blurred and halved (cv2.pyrDown). Built once per
+    upload and kept alongside the original, so detection and quality gating
+    run on small levels and only regions of interest are revisited at full
+    resolution.
+    """
+    levels: List[np.ndarray] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, image_array: np.ndarray, min_side: int = PYRAMID_MIN_SIDE) -> "ImagePyramid":
+        if isinstance(image_array, ImagePyramid):
+            return image_array
+        if isinstance(image_array, DicomImage):
+            image_array = image_array.frame(0)
+        level = np.asarray(image_array, dtype=np.float32)
+        levels = [level]
+        while level.ndim == 2 and max(level.shape) // 2 >= min_side and min(level.shape) >= 2:
+            level = cv2.pyrDown(level)
+            levels.append(level)
+        return cls(levels)
+
+    @property
+    def full(self) -> np.ndarray:
+        return self.levels[0]
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.levels[0].shape
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels)
+
+    def scale(self, level: int) -> float:
+        """Full-resolution pixels per pixel of `level` along each axis."""
+        return self.shape[0] / self.levels[level].shape[0]
+
+    def level_for(self, max_side: int) -> int:
+        """Finest level whose longer side fits in max_side (the coarsest if none does)."""
+        for i, level in enumerate(self.levels):
+            if max(level.shape[:2]) <= max_side:
+                return i
+        return self.depth - 1
+
+    def to_full_resolution(self, box: Tuple[int, int, int, int], level: int) -> Tuple[int, int, int, int]:
+        """(y0, x0, y1, x1) on `level` -> the same region on level 0, clipped to the image."""
+        height, width = self.shape[:2]
+        sy, sx = height / self.levels[level].shape[0], width / self.levels[level].shape[1]
+        y0, x0, y1, x1 = box
+        return (max(0, int(np.floor(y0 * sy))), max(0, int(np.floor(x0 * sx))),
+                min(height, int(np.ceil(y1 * sy))), min(width, int(np.ceil(x1 * sx))))
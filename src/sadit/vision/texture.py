@@ -0,0 +1,260 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Gruen zones: 1-3 lateral (proximal to distal), 4 below the tip, 5-7 medial (distal to proximal)
+GRUEN_ZONES = (1, 2, 3, 4, 5, 6, 7)
+
+
+@dataclass
+class TextureMaps:
+    """
+    Per-pixel texture over a sliding `window` x `window` neighbourhood
+    (clipped at the borders): intensity variance, Shannon entropy (bits)
+    of the `bins`-level histogram and mean squared Sobel gradient.
+    """
+    variance: np.ndarray
+    entropy: np.ndarray
+    gradient_energy: np.ndarray
+    window: int
+    bins: int
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.variance.shape
+
+    def osteolysis(self) -> np.ndarray:
+        """
+        Heat map in [0, 1]: mean of the three maps, each scaled to its
+        99th percentile (entropy to its log2(bins) maximum). Heterogeneous,
+        disorganised bone scores high; homogeneous bone and metal score low.
+        """
+        heat = np.minimum(self.entropy / np.float32(np.log2(self.bins)), 1.0)
+        for texture in (self.variance, self.gradient_energy):
+            scale = float(np.percentile(texture, 99))
+            if scale > 0:
+                heat += np.minimum(texture / np.float32(scale), 1.0)
+        heat /= np.float32(3.0)
+        return heat
+
+
+@dataclass(frozen=True)
+class StemAxis:
+    """Femoral stem on the image: its long axis from the proximal end to the tip."""
+    origin: Tuple[float, float]  # (y, x) proximal end, on the axis
+    direction: Tuple[float, float]  # unit (dy, dx) towards the tip
+    length_px: float
+    half_width_px: float
+    # Sign of the perpendicular coordinate on the medial side (the head's side)
+    medial_sign: float
+
+    def bounds(self, shape: Tuple[int, int], margin_px: float) -> Tuple[int, int, int, int]:
+        """(y0, x0, y1, x1) box around the stem and `margin_px` of bone, clipped to the image."""
+        (oy, ox), (dy, dx) = self.origin, self.direction
+        reach = self.half_width_px + margin_px
+        corners = [(oy + a * dy - p * dx, ox + a * dx + p * dy)
+                   for a in (0.0, self.length_px + margin_px) for p in (-reach, reach)]
+        ys, xs = zip(*corners)
+        return (max(0, int(np.floor(min(ys)))), max(0, int(np.floor(min(xs)))),
+                min(shape[0], int(np.ceil(max(ys))) + 1), min(shape[1], int(np.ceil(max(xs))) + 1))
+
+    def coordinates(self, box: Tuple[int, int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(axial, perpendicular) coordinates, in pixels, of every pixel in box (y0, x0, y1, x1)."""
+        y0, x0, y1, x1 = box
+        ys = np.arange(y0, y1, dtype=np.float32)[:, None] - np.float32(self.origin[0])
+        xs = np.arange(x0, x1, dtype=np.float32)[None, :] - np.float32(self.origin[1])
+        dy, dx = np.float32(self.direction[0]), np.float32(self.direction[1])
+        return ys * dy + xs * dx, xs * dy - ys * dx
+
+
+class TextureMapEngine:
+    """
+    [INTEGRAL IMAGES]
+    Whole-image texture maps in O(N) regardless of the window size: every
+    windowed sum is four lookups into a summed-area table (cv2.integral).
+    Variance comes from the tables of x and x^2, entropy from one count
+    table per histogram bin (H = log2 n - sum(c log2 c) / n, with c log2 c
+    from a lookup table), gradient energy from the table of the squared
+    Sobel magnitude. Maps are then aggregated per Gruen zone around the
+    stem segmented from the detected prosthetic head.
+    """
+
+    WINDOW = 15
+    BINS = 16
+    # Width of the periprosthetic band analysed on each side of the stem
+    ZONE_MARGIN_MM = 10.0
+
+    def __init__(self, window: int = WINDOW, bins: int = BINS):
+        if window < 1 or window % 2 == 0:
+            raise ValueError(f"window must be a positive odd size, got {window}")
+        self.window = window
+        self.bins = bins
+        # c * log2(c) for every possible count in a window (256 entries for
+        # cv2.LUT while counts fit in uint8, i.e. windows up to 15 x 15)
+        counts = np.arange(max(256, window * window + 1), dtype=np.float64)
+        self._c_log_c = (counts * np.log2(np.maximum(counts, 1))).astype(np.float32)
+
+    @staticmethod
+    def _normalize(image: np.ndarray) -> np.ndarray:
+        image = np.asarray(image, dtype=np.float32)
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        low, high = float(image.min()), float(image.max())
+        return (image - np.float32(low)) / np.float32(high - low if high > low else 1.0)
+
+    def _window_sums(self, table: np.ndarray) -> np.ndarray:
+        # Table of the image zero-padded by the window radius: windows are slices
+        k = self.window
+        sums = cv2.subtract(table[k:, k:], table[:-k, k:])
+        cv2.subtract(sums, table[k:, :-k], dst=sums)
+        return cv2.add(sums, table[:-k, :-k], dst=sums)
+
+    def _window_sizes(self, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Pixels of each (border-clipped) window, separable into rows x columns
+        r = self.window // 2
+        rows, cols = (np.minimum(np.arange(n) + r + 1, n) - np.maximum(np.arange(n) - r, 0)
+                      for n in shape)
+        return rows.astype(np.float32)[:, None], cols.astype(np.float32)[None, :]
+
+    def compute(self, image: np.ndarray) -> TextureMaps:
+        image = self._normalize(image)
+        r = self.window // 2
+        rows, cols = self._window_sizes(image.shape)
+        n = rows * cols
+
+        def pad(values, value=0):
+            return cv2.copyMakeBorder(values, r, r, r, r, cv2.BORDER_CONSTANT, value=value)
+
+        # Variance: E[x^2] - E[x]^2 (float64 tables, no cancellation issue in [0, 1])
+        total, squares = cv2.integral2(pad(image), sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        mean = (self._window_sums(total) / n).astype(np.float32)
+        variance = np.maximum((self._window_sums(squares) / n).astype(np.float32) - mean * mean, 0.0)
+
+        # Entropy: one integer count table per histogram bin (the border is in no bin)
+        labels = pad(np.minimum(image * self.bins, self.bins - 1).astype(np.uint8), value=self.bins)
+        c_log_c = np.zeros(image.shape, np.float32)
+        for b in range(self.bins):
+            counts = self._window_sums(cv2.integral(np.uint8(labels == b), sdepth=cv2.CV_32S))
+            if self.window <= 15:
+                np.add(c_log_c, cv2.LUT(counts.astype(np.uint8), self._c_log_c[:256]), out=c_log_c)
+            else:
+                c_log_c += self._c_log_c[counts]
+        entropy = np.log2(n) - c_log_c / n
+
+        gx = cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=3)
+        gy = cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=3)
+        energy = cv2.integral(pad(gx * gx + gy * gy), sdepth=cv2.CV_64F)
+        gradient_energy = (self._window_sums(energy) / n).astype(np.float32)
+
+        return TextureMaps(variance=variance, entropy=np.maximum(entropy, 0.0), gradient_energy=gradient_energy,
+                           window=self.window, bins=self.bins)
+
+    def segment_metal(self, image: np.ndarray, head_center: Tuple[float, float],
+                      head_radius_px: float) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the implant: the bright component containing the
+        head, thresholded between the background/bone split (Otsu) and the
+        head's own intensity. None when the head is not on a bright component.
+        """
+        image8 = np.round(self._normalize(image) * 255).astype(np.uint8)
+        cy, cx = head_center
+        ys, xs = np.ogrid[:image8.shape[0], :image8.shape[1]]
+        head = (ys - cy) ** 2 + (xs - cx) ** 2 <= (head_radius_px * 0.8) ** 2
+        if not head.any():
+            return None
+        otsu, _ = cv2.threshold(image8, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        level = float(np.median(image8[head]))
+        metal = np.uint8(image8 > (otsu + max(otsu, level)) / 2)
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        metal = cv2.morphologyEx(cv2.morphologyEx(metal, cv2.MORPH_OPEN, kernel), cv2.MORPH_CLOSE, kernel)
+        _, components = cv2.connectedComponents(metal)
+        ids, counts = np.unique(components[head], return_counts=True)
+        counts[ids == 0] = 0
+        if not counts.any():
+            return None
+        return components == ids[np.argmax(counts)]
+
+    def find_stem(self, metal: np.ndarray, head_center: Tuple[float, float],
+                  head_radius_px: float) -> Optional[StemAxis]:
+        """
+        Stem axis from the implant mask minus the head. The principal axis
+        of the distal two thirds (clear of the neck), oriented away from the
+        head, gives the direction and the width; the proximal end is where
+        the mask first fills that straight band. The medial side is the
+        side of the axis where the head (neck offset) lies. None when no
+        elongated part is attached to the head.
+        """
+        cy, cx = head_center
+        points = np.argwhere(metal).astype(np.float64)
+        points = points[((points - (cy, cx)) ** 2).sum(axis=1) > (head_radius_px * 1.15) ** 2]
+        if len(points) < head_radius_px ** 2:
+            return None
+
+        def principal_axis(subset):
+            center = subset.mean(axis=0)
+            direction = np.linalg.eigh(np.cov((subset - center).T))[1][:, -1]
+            return center, direction if np.dot(center - (cy, cx), direction) >= 0 else -direction
+
+        center, direction = principal_axis(points)
+        axial = (points - center) @ direction
+        distal = points[axial >= axial.min() + (axial.max() - axial.min()) / 3]
+        center, direction = principal_axis(distal)
+        normal = np.array([-direction[1], direction[0]])
+        half_width = float(np.percentile(np.abs((distal - center) @ normal), 99))
+        axial = (points - center) @ direction
+        in_band = np.abs((points - center) @ normal) <= half_width
+        start, tip = float(axial[in_band].min()), float(axial.max())
+        head_side = float(np.dot(np.array([cy, cx]) - center, normal))
+        return StemAxis(origin=tuple(float(v) for v in center + start * direction),
+                        direction=(float(direction[0]), float(direction[1])),
+                        length_px=tip - start, half_width_px=half_width,
+                        medial_sign=1.0 if head_side >= 0 else -1.0)
+
+    def gruen_zone_labels(self, shape: Tuple[int, int], stem: StemAxis, margin_px: float,
+                          metal: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        uint8 map of Gruen zones (0 = outside): bands `margin_px` wide along
+        each side of the stem, split into thirds of its length (1-3
+        lateral, 7-5 medial, proximal to distal), and zone 4 below the tip.
+        Only the box around the stem is evaluated. Pixels whose texture
+        window reaches the `metal` mask are left out (metal edges would
+        dominate every map).
+        """
+        labels = np.zeros(shape, np.uint8)
+        box = stem.bounds(shape, margin_px)
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return labels
+        axial, perpendicular = stem.coordinates(box)
+        side = perpendicular * np.float32(stem.medial_sign)
+        distance = np.abs(side)
+        band = (distance > stem.half_width_px) & (distance <= stem.half_width_px + margin_px)
+        third = np.clip((axial * np.float32(3.0 / stem.length_px)).astype(np.int8), 0, 2)
+        along = (axial >= 0) & (axial <= stem.length_px)
+        zones = labels[box[0]:box[2], box[1]:box[3]]
+        lateral = band & along & (side < 0)
+        medial = band & along & (side > 0)
+        zones[lateral] = 1 + third[lateral]
+        zones[medial] = 7 - third[medial]
+        below = ((axial > stem.length_px) & (axial <= stem.length_px + margin_px)
+                 & (distance <= stem.half_width_px + margin_px))
+        zones[below] = 4
+        if metal is not None:
+            reach = cv2.getStructuringElement(cv2.MORPH_RECT, (self.window + 2, self.window + 2))
+            labels[cv2.dilate(np.uint8(metal), reach).astype(bool)] = 0
+        return labels
+
+    @staticmethod
+    def aggregate(maps: TextureMaps, labels: np.ndarray, heat: Optional[np.ndarray] = None) -> dict:
+        """Mean of every map (and the osteolysis heat map) per Gruen zone, in one bincount each."""
+        heat = maps.osteolysis() if heat is None else heat
+        inside = np.flatnonzero(labels)
+        flat = labels.ravel()[inside]
+        pixels = np.bincount(flat, minlength=len(GRUEN_ZONES) + 1)
+        means = {name: np.bincount(flat, weights=values.ravel()[inside], minlength=len(GRUEN_ZONES) + 1)
+                 / np.maximum(pixels, 1)
+                 for name, values in (("variance", maps.variance), ("entropy", maps.entropy),
+                                      ("gradient_energy", maps.gradient_energy), ("osteolysis", heat))}
+        return {str(zone): {"pixels": int(pixels[zone]), **{name: float(m[zone]) for name, m in means.items()}}
+                for zone in GRUEN_ZONES}
@@ -0,0 +1,25 @@
+from src.sadit.vision.enhancement import CZTEnhancedEmulator
+from src.sadit.vision.pyramid import ImagePyramid
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+
+
+def test_batch_matches_single_image_enrichment(tmp_path):
+    rng = np.random.default_rng(0)
+    images = [rng.uniform(0.2, 0.8, (128, 96)).astype(np.float32) for _ in range(3)]
+    path = os.path.join(tmp_path, "film.npy")
+    np.save(path, images[2])
+    emulator = CZTEnhancedEmulator(workers=1)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        batch = emulator.enrich_batch([images[0], ImagePyramid.build(images[1]), path, "missing.png"],
+                                      executor=executor)
+    with batch:
+        assert len(batch) == 4
+        for i in range(3):
+            np.testing.assert_array_equal(batch[i], emulator.enrich_image(images[i]))
+            assert not batch[i].flags.writeable
+        # A bad input is reported, the rest of the batch completes
+        assert batch[3] is None and isinstance(batch.errors[3], ValueError)
+    assert batch[0] is None
@@ -0,0 +1,357 @@
+from src.sadit.inference.bayesian import SaditBayesianEngine
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return SaditBayesianEngine()
+
+
+def test_compiled_table_matches_variable_elimination(engine):
+    # Every evidence combination, each checked against pgmpy VE
+    assert engine.verify_posterior_table() < 1e-12
+
+
+def test_table_and_ve_paths_agree(engine):
+    case = dict(location="inguinal", pain_character="mechanical",
+                ild_months=6, imaging_status="Radiolucent Line", mobility="cane")
+    fast = engine.infer_diagnosis(**case)
+    exact = engine.infer_diagnosis(**case, method="variable_elimination")
+
+    assert fast.most_likely_diagnosis == exact.most_likely_diagnosis == "Scenario_B_Loosening"
+    assert np.isclose(fast.scenario_b_prob, exact.scenario_b_prob)
+
+
+def test_cpd_update_recompiles_table():
+    from pgmpy.factors.discrete import TabularCPD
+
+    engine = SaditBayesianEngine()
+    before = engine.infer_diagnosis("distal", "mechanical", 1, "Stable", "none")
+    engine.update_cpds(TabularCPD(variable='Diagnosis', variable_card=3, values=[[0.1], [0.6], [0.3]],
+                                  state_names={'Diagnosis': ['Scenario_A', 'Scenario_B', 'Infection']}))
+    after = engine.infer_diagnosis("distal", "mechanical", 1, "Stable", "none")
+
+    assert after.scenario_a_prob < before.scenario_a_prob
+    assert engine.verify_posterior_table() < 1e-12
+
+
+def test_batch_matches_single_case_inference(engine):
+    import pandas as pd
+
+    cohort = pd.DataFrame({
+        'location': ['distal', 'inguinal', 'diffuse', 'Distal femur'],
+        'pain_character': ['mechanical', 'mechanical', 'terebrante', 'night pain'],
+        'ild_months': [1, 6, 24, 2],
+        'imaging_status': ['Stable', 'Radiolucent Line', 'Stable', 'loose'],
+        'mobility': ['none', 'cane', 'wheelchair', 'Independent'],
+    })
+    batch = engine.infer_diagnosis_batch(cohort)
+
+    assert len(batch) == len(cohort)
+    for i, row in enumerate(cohort.itertuples(index=False)):
+        single = engine.infer_diagnosis(row.location, row.pain_character, row.ild_months,
+                                        row.imaging_status, row.mobility)
+        assert np.isclose(batch.scenario_a_prob[i], single.scenario_a_prob)
+        assert np.isclose(batch.infection_prob[i], single.infection_prob)
+        assert batch.most_likely_diagnosis[i] == single.most_likely_diagnosis
+
+    frame = batch.to_frame()
+    assert np.allclose(frame[['scenario_a_prob', 'scenario_b_prob', 'infection_prob']].sum(axis=1), 1.0)
+
+
+def test_partial_evidence_is_marginalized(engine):
+    # (card + 1) per node: every subset of observed nodes is precompiled
+    assert engine.posterior_table.shape == (5, 3, 5, 3, 5, 3)
+    assert engine.verify_posterior_table() < 1e-12
+
+    partial = engine.infer_diagnosis(location="inguinal", pain_character="mechanical", ild_months=6)
+    exact = engine.infer_diagnosis(location="inguinal", pain_character="mechanical", ild_months=6,
+                                   method="variable_elimination")
+    assert "Imaging" not in partial.evidence_used and "Mobility" not in partial.evidence_used
+    assert np.isclose(partial.scenario_b_prob, exact.scenario_b_prob)
+
+    # Omitting imaging must differ from silently assuming 'Stable'
+    assumed = engine.infer_diagnosis("inguinal", "mechanical", 6, "Stable", "cane")
+    unknown = engine.infer_diagnosis("inguinal", "mechanical", 6, None, "cane")
+    assert not np.isclose(assumed.scenario_b_prob, unknown.scenario_b_prob)
+
+    # No evidence at all returns the prior
+    prior = engine.infer_diagnosis()
+    assert np.isclose(prior.scenario_b_prob, 0.5)
+
+
+def test_omitted_ild_reaches_the_engine_as_unknown():
+    from src.sadit.clinical.models import ClinicalInput, PainProfile
+    from src.sadit.clinical.semiology import SemiologyEngine
+
+    pain = PainProfile(onset="gradual", location="inguinal", intensity=6, character="mechanical", irradiation=False)
+    result = SemiologyEngine().process(ClinicalInput(pain_profile=pain, ild_months=None, mobility_assistance=None))
+    assert result.citation_source.endswith("ILD unknown")  # not a made-up 12 months
+
+
+def test_batch_handles_missing_cells(engine):
+    batch = engine.infer_diagnosis_batch(
+        location=['inguinal', None, 'distal'],
+        pain_character=['mechanical', 'mechanical', 'unknown'],
+        ild_months=[6, float('nan'), 1],
+        mobility=['cane', 'none', None])
+
+    for i, (loc, pain, ild, mob) in enumerate([('inguinal', 'mechanical', 6, 'cane'),
+                                               (None, 'mechanical', None, 'none'),
+                                               ('distal', None, 1, None)]):
+        single = engine.infer_diagnosis(loc, pain, ild, None, mob)
+        assert np.isclose(batch.scenario_a_prob[i], single.scenario_a_prob)
+        assert np.isclose(batch.scenario_b_prob[i], single.scenario_b_prob)
+
+
+def test_online_learner_updates_and_hot_swaps(tmp_path):
+    from types import SimpleNamespace
+    from src.sadit.inference.learning import OnlineCPDLearner
+
+    engine = SaditBayesianEngine()
+    learner = OnlineCPDLearner.from_engine(engine, equivalent_sample_size=10)
+
+    # Publishing without data reproduces the expert CPDs
+    baseline = learner.publish(tenant_id=7)
+    assert np.allclose(baseline.prior, [0.3, 0.5, 0.2])
+
+    records = [SimpleNamespace(id=i, inferred_diagnosis="CRITICAL: Suspected Septic Process.",
+                               pain_profile_json={'location': 'distal', 'character': 'terebrante'})
+               for i in range(1, 31)]
+    records.append(SimpleNamespace(id=31, inferred_diagnosis=None, pain_profile_json={}))
+    assert learner.update_from_records(7, records, engine) == 30
+
+    snapshot = learner.publish(tenant_id=7)
+    assert snapshot.version == 2 and snapshot.last_record_id == 31
+    assert np.isclose(snapshot.prior[2], (0.2 * 10 + 30) / 40)
+    # Other tenants are unaffected
+    assert np.allclose(learner.publish(tenant_id=8).prior, [0.3, 0.5, 0.2])
+
+    before = engine.infer_diagnosis("distal", "terebrante", 12, None, None).infection_prob
+    engine.load_snapshot(snapshot)
+    after = engine.infer_diagnosis("distal", "terebrante", 12, None, None).infection_prob
+    assert after > before
+    assert engine.verify_posterior_table() < 1e-12
+
+    # Counts survive a restart
+    learner.save(str(tmp_path / "stats.npz"))
+    restored = OnlineCPDLearner.from_engine(SaditBayesianEngine())
+    restored.load(str(tmp_path / "stats.npz"))
+    assert restored.statistics(7).last_record_id == 31
+    assert np.allclose(restored.publish(7).likelihoods['Location'], snapshot.likelihoods['Location'])
+
+
+def test_artifact_roundtrip_serves_without_pgmpy(engine, tmp_path):
+    import subprocess
+    import sys
+
+    path = tmp_path / "model.npz"
+    engine.export_artifact(str(path))
+
+    loaded = SaditBayesianEngine.from_artifact(str(path))
+    assert loaded.compiled.version == engine.compiled.version
+    assert np.array_equal(loaded.posterior_table, engine.posterior_table)
+    # VE fallback rebuilds the pgmpy model lazily
+    assert loaded.verify_posterior_table() < 1e-12
+
+    probe = (
+        "import sys\n"
+        "from src.sadit.inference.bayesian import SaditBayesianEngine\n"
+        f"e = SaditBayesianEngine.from_artifact({str(path)!r})\n"
+        "r = e.infer_diagnosis('inguinal', 'mechanical', 6, 'loose', 'cane')\n"
+        "assert r.most_likely_diagnosis == 'Scenario_B_Loosening'\n"
+        "assert not any(m.startswith('pgmpy') for m in sys.modules)\n"
+    )
+    subprocess.run([sys.executable, "-c", probe], check=True)
+
+
+def test_batch_mapping_edge_cases(engine):
+    import pandas as pd
+
+    # pandas nullable dtypes carry pd.NA (read_sql / Arrow loads)
+    frame = pd.DataFrame({
+        'location': pd.array(['distal', pd.NA, ' Inguinal '], dtype='string'),
+        'ild_months': pd.array([1, pd.NA, 24], dtype='Int64'),
+        'mobility': pd.array([' cane', 'WHEELCHAIR ', pd.NA], dtype='string'),
+    })
+    batch = engine.infer_diagnosis_batch(frame)
+    for i, (loc, ild, mob) in enumerate([('distal', 1, ' cane'), (None, None, 'WHEELCHAIR '),
+                                         (' Inguinal ', 24, None)]):
+        single = engine.infer_diagnosis(location=loc, ild_months=ild, mobility=mob)
+        assert np.isclose(batch.scenario_b_prob[i], single.scenario_b_prob)
+    assert engine.map_evidence(mobility=' cane')['Mobility'] == 'Cane'
+    assert engine.map_evidence(location=pd.NA) == {}
+
+    # A frame without any evidence column still yields one row per case
+    empty = engine.infer_diagnosis_batch(pd.DataFrame({'patient_id': [1, 2, 3]}))
+    assert len(empty) == 3
+    assert np.allclose(empty.scenario_b_prob, 0.5)
+
+
+def test_train_from_multimodal_accumulates_persisted_counts(tmp_path):
+    state = str(tmp_path / "learning" / "cpd_counts.npz")
+    engine = SaditBayesianEngine()
+    assert engine.snapshot_version == 0
+
+    first = engine.train_from_multimodal(learner_state_path=state)
+    n_first = first.n_observations
+    assert n_first > 0 and engine.snapshot_version == first.version
+
+    # A second run (new process) resumes the counts; already seen files are not recounted
+    again = SaditBayesianEngine().train_from_multimodal(learner_state_path=state)
+    assert again.n_observations == n_first
+    assert again.version == first.version + 1
+    assert np.allclose(again.prior, first.prior)
+
+
+def test_ve_query_uses_model_bound_to_its_compiled_network():
+    from src.sadit.inference.learning import OnlineCPDLearner
+
+    engine = SaditBayesianEngine()
+    old = engine.compiled
+    learner = OnlineCPDLearner.from_engine(engine)
+    learner.update(None, [('Infection', {'PainType': 'Inflammatory'})] * 20)
+    engine.load_snapshot(learner.publish(None))
+
+    # A query that captured the old network still gets the old answer
+    evidence = {'PainType': 'Inflammatory'}
+    assert np.allclose(engine._query_variable_elimination(evidence, old), old.lookup(evidence))
+    assert engine.verify_posterior_table() < 1e-12
+
+
+def test_load_engine_ignores_stale_artifact(engine, tmp_path, monkeypatch):
+    from src.sadit.inference import bayesian
+
+    path = str(tmp_path / "model.npz")
+    engine.export_artifact(path)
+    assert bayesian.load_engine(path)._pgmpy is None  # current: served from the artifact
+
+    # Expert CPDs edited after the artifact was built -> rebuild from source
+    edited = dict(bayesian.EXPERT_CPDS, Imaging=(['Stable', 'Loose'], [[0.8, 0.2, 0.6], [0.2, 0.8, 0.4]]))
+    monkeypatch.setattr(bayesian, "EXPERT_CPDS", edited)
+    with pytest.warns(UserWarning, match="does not match"):
+        rebuilt = bayesian.load_engine(path)
+    assert rebuilt.compiled.version != engine.compiled.version
+    assert np.allclose(rebuilt.compiled.likelihoods['Imaging'][0], [0.8, 0.2, 0.6])
+
+
+def test_sensitivity_analysis_matches_resubmitted_cases(engine):
+    case = dict(location='distal', pain_character='mechanical', ild_months=24,
+                imaging_status=None, mobility='cane')
+    result = engine.sensitivity_analysis(**case, include_pairs=True)
+
+    assert result.scenarios[0] == {}
+    base = engine.infer_diagnosis(**case)
+    assert np.allclose(result.baseline, [base.scenario_a_prob, base.scenario_b_prob, base.infection_prob])
+
+    # Observed nodes: other states + unknown (4, 2, 4, -, 4); Imaging: Stable/Loose
+    flips = [4, 2, 4, 2, 4]
+    singles = [s for s in result.scenarios if len(s) == 1]
+    assert len(singles) == sum(flips)
+    pairs = (sum(flips) ** 2 - sum(f * f for f in flips)) // 2
+    assert len(result.scenarios) == 1 + len(singles) + pairs
+
+    arguments = {'Location': 'location', 'PainType': 'pain_character', 'ILD': 'ild_months',
+                 'Imaging': 'imaging_status', 'Mobility': 'mobility'}
+    inputs = {'Distal': 'distal', 'Inguinal': 'inguinal', 'Diffuse': 'diffuse', 'Local': 'local',
+              'Mechanical': 'mechanical', 'Inflammatory': 'inflammatory',
+              '<3m': 1, '3-12m': 6, '12-60m': 24, '>=60m': 80, 'Stable': 'stable', 'Loose': 'loose',
+              'Independent': 'independent', 'Cane': 'cane', 'Walker': 'walker',
+              'Wheelchair': 'wheelchair', None: None}
+    for changes, probs in zip(result.scenarios, result.posteriors):
+        what_if = dict(case, **{arguments[n]: inputs[s] for n, s in changes.items()})
+        r = engine.infer_diagnosis(**what_if)
+        assert np.allclose(probs, [r.scenario_a_prob, r.scenario_b_prob, r.infection_prob])
+
+    # Weight of evidence: observed nodes only, consistent with Bayes' rule
+    assert set(result.weight_of_evidence) == {'Location', 'PainType', 'ILD', 'Mobility'}
+    woe = np.array([[result.weight_of_evidence[n][d] for d in ['Scenario_A', 'Scenario_B', 'Infection']]
+                    for n in result.weight_of_evidence])
+    single_node = engine.infer_diagnosis(imaging_status='loose')
+    loose = engine.sensitivity_analysis(imaging_status='loose').weight_of_evidence['Imaging']
+    expected = np.log([single_node.scenario_a_prob, single_node.scenario_b_prob, single_node.infection_prob]) \
+        - np.log(engine.compiled.prior)
+    assert np.allclose(list(loose.values()), expected)
+    assert woe.shape == (4, 3)
+
+
+def test_monte_carlo_interval_is_cached_per_version():
+    engine = SaditBayesianEngine()
+    interval = engine.infer_diagnosis_interval(location='distal', pain_character='mechanical',
+                                               ild_months=1, level=0.9)
+    point = engine.infer_diagnosis(location='distal', pain_character='mechanical', ild_months=1)
+
+    assert interval.n_samples > 1000
+    assert np.all(interval.lower <= interval.upper)
+    assert interval.lower[0] < point.scenario_a_prob < interval.upper[0]
+    assert np.allclose(interval.mean, [point.scenario_a_prob, point.scenario_b_prob, point.infection_prob],
+                       atol=0.03)
+    # More pseudo-counts -> tighter intervals
+    tight = engine.infer_diagnosis_interval(location='distal', concentration=1000.0)
+    loose = engine.infer_diagnosis_interval(location='distal', concentration=5.0)
+    assert np.all(tight.upper - tight.lower < loose.upper - loose.lower)
+
+    # Same version -> same draws; a model update redraws
+    samples = engine.cpd_samples()
+    assert engine.cpd_samples() is samples
+    from pgmpy.factors.discrete import TabularCPD
+    engine.update_cpds(TabularCPD(variable='Imaging', variable_card=2,
+                                  values=[[0.8, 0.2, 0.6], [0.2, 0.8, 0.4]],
+                                  evidence=['Diagnosis'], evidence_card=[3],
+                                  state_names={'Imaging': ['Stable', 'Loose'],
+                                               'Diagnosis': ['Scenario_A', 'Scenario_B', 'Infection']}))
+    assert engine.cpd_samples() is not samples
+    assert engine.cpd_samples().version == engine.compiled.version
+
+
+def test_multi_state_nodes_and_configurable_ild_bins(engine):
+    evidence = engine.map_evidence(location='diffuse', ild_months=12, mobility='Wheelchair')
+    assert evidence == {'Location': 'Diffuse', 'ILD': '12-60m', 'Mobility': 'Wheelchair'}
+    assert engine.map_evidence(location='groin')['Location'] == 'Inguinal'  # fallback
+    # Diffuse pain and wheelchair use point towards infection more than cane use
+    diffuse = engine.infer_diagnosis(location='diffuse', mobility='wheelchair')
+    distal = engine.infer_diagnosis(location='distal', mobility='cane')
+    assert diffuse.infection_prob > distal.infection_prob
+
+    batch = engine.infer_diagnosis_batch(ild_months=[0, 2.9, 3, 11, 12, 59, 60, 240])
+    bins = [engine.map_evidence(ild_months=m)['ILD'] for m in [0, 2.9, 3, 11, 12, 59, 60, 240]]
+    assert bins == ['<3m', '<3m', '3-12m', '3-12m', '12-60m', '12-60m', '>=60m', '>=60m']
+    for i, m in enumerate([0, 2.9, 3, 11, 12, 59, 60, 240]):
+        assert np.isclose(batch.scenario_b_prob[i], engine.infer_diagnosis(ild_months=m).scenario_b_prob)
+
+    custom = SaditBayesianEngine(ild_bin_edges=(6,), cpds={
+        'ILD': (['<6m', '>=6m'], [[0.8, 0.1, 0.4], [0.2, 0.9, 0.6]])})
+    assert custom.map_evidence(ild_months=7)['ILD'] == '>=6m'
+    with pytest.raises(ValueError, match="bin"):
+        SaditBayesianEngine(ild_bin_edges=(6,))
+    # Same number of bins: the expert rows must not be reused for other edges
+    with pytest.raises(ValueError, match="own ILD CPD"):
+        SaditBayesianEngine(ild_bin_edges=(6, 24, 120))
+
+
+def test_large_state_space_skips_joint_table(engine):
+    from src.sadit.inference.bayesian import compile_network, EVIDENCE_NODES
+
+    compiled = engine.compiled
+    cpds = {node: compiled.likelihoods[node][:-1] for node in EVIDENCE_NODES}
+    per_node = compile_network(compiled.prior, cpds, compiled.state_names, max_table_cells=100)
+    assert per_node.posterior_table is None
+    assert per_node.version == compiled.version
+
+    cases = [{}, {'Location': 'Diffuse', 'ILD': '>=60m'},
+             {'Location': 'Local', 'PainType': 'Inflammatory', 'Imaging': 'Loose', 'Mobility': 'Walker'}]
+    for evidence in cases:
+        assert np.allclose(per_node.lookup(evidence), compiled.lookup(evidence))
+
+
+def test_batch_intervals_match_single_case(engine):
+    cases = dict(location=['distal', 'inguinal', 'distal', None],
+                 ild_months=[1, 30, 1, 80], mobility=['cane', None, 'cane', 'wheelchair'])
+    batch = engine.infer_diagnosis_interval_batch(**cases)
+    assert batch.lower.shape == (4, 3)
+    for i in range(4):
+        single = engine.infer_diagnosis_interval(location=cases['location'][i],
+                                                 ild_months=cases['ild_months'][i],
+                                                 mobility=cases['mobility'][i])
+        assert np.allclose(batch.lower[i], single.lower) and np.allclose(batch.upper[i], single.upper)
@@ -0,0 +1,91 @@
+from src.sadit.compliance.checker import SADIT_Compliance_Checker
+from src.sadit.inference.orchestrator import load_image
+from src.sadit.vision.dicom import DicomImage
+from src.sadit.vision.optimizer import VisionHeuristicOptimizer
+import numpy as np
+import pytest
+
+pydicom = pytest.importorskip("pydicom")
+from pydicom.dataset import Dataset, FileMetaDataset  # noqa: E402
+from pydicom.uid import ExplicitVRLittleEndian, RLELossless, SecondaryCaptureImageStorage, generate_uid  # noqa: E402
+
+
+def write_dicom(path, frames, spacing=None, photometric="MONOCHROME2", compress=False, **attributes):
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.Modality = "DX"
+    ds.Rows, ds.Columns = frames.shape[1:]
+    ds.NumberOfFrames = len(frames)
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, 12, 11
+    ds.PixelRepresentation, ds.SamplesPerPixel = 0, 1
+    ds.PhotometricInterpretation = photometric
+    if spacing:
+        ds.PixelSpacing = list(spacing)
+    for name, value in attributes.items():
+        setattr(ds, name, value)
+    ds.PixelData = frames.astype(np.uint16).tobytes()
+    if compress:
+        ds.compress(RLELossless)
+    ds.save_as(path, enforce_file_format=True)
+    return str(path)
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.integers(1900, 2100, (3, 1024, 1040)).astype(np.uint16)
+
+
+def test_uncompressed_frames_are_memory_mapped(tmp_path, frames):
+    stored = frames | 0x8000  # overlay bit above BitsStored
+    path = write_dicom(tmp_path / "study.dcm", stored, spacing=(0.14, 0.14), photometric="MONOCHROME1",
+                       RescaleSlope=2, RescaleIntercept=-100, WindowCenter=3900, WindowWidth=2000)
+    dicom = DicomImage(path)
+    assert dicom.memory_mapped and len(dicom) == 3
+    assert dicom.header.pixel_spacing == (0.14, 0.14)
+    assert isinstance(dicom.raw_frame(2), np.memmap)
+    assert np.array_equal(dicom.raw_frame(2), stored[2])
+
+    modality = dicom.modality_frame(1)
+    assert modality.dtype == np.float32
+    assert np.array_equal(modality, frames[1] * 2.0 - 100)
+    display = dicom.frame(1)
+    expected = np.clip((frames[1] * 2.0 - 100 - 3899.5) / 1999 + 0.5, 0, 1)
+    assert np.allclose(display, 1 - expected, atol=1e-6)  # MONOCHROME1 inverted
+    assert [f.shape for f in dicom.frames()] == [(1024, 1040)] * 3
+
+    # Header spacing replaces anatomical calibration
+    assert VisionHeuristicOptimizer().calibrar_anatomicamente(dicom) == pytest.approx(0.14)
+    assert SADIT_Compliance_Checker.check_image_safety(path)
+    assert np.array_equal(load_image(path), dicom.frame(0))
+
+
+def test_compressed_frames_decode_one_at_a_time(tmp_path, frames):
+    path = write_dicom(tmp_path / "rle.dcm", frames, compress=True)
+    dicom = DicomImage(path)
+    assert not dicom.memory_mapped and dicom.header.pixel_spacing is None
+    assert np.array_equal(dicom.raw_frame(1), frames[1])
+    display = dicom.frame(0)
+    assert display.min() == 0.0 and display.max() == 1.0  # no window: min/max scaling
+
+
+def test_gruen_zones_use_the_header_spacing(tmp_path):
+    import cv2
+    hip = np.full((1024, 1024), 800, np.uint16)
+    cv2.circle(hip, (500, 350), 75, 2500, -1)
+    cv2.line(hip, (500, 350), (650, 475), 2350, 35)
+    cv2.rectangle(hip, (625, 450), (675, 950), 2200, -1)
+    hip += np.random.default_rng(0).integers(0, 40, hip.shape).astype(np.uint16)
+    optimizer = VisionHeuristicOptimizer()
+    zones = {}
+    for spacing in (0.1, 0.3):
+        dicom = DicomImage(write_dicom(tmp_path / f"hip_{spacing}.dcm", hip[None], spacing=(spacing, spacing)))
+        result = optimizer.analyze_gruen_zones(dicom)
+        assert result["stem"] is not None and result["pixel_spacing"] == pytest.approx(spacing)
+        zones[spacing] = result["zones"]
+    # 10 mm is a wider band at the finer spacing
+    assert zones[0.1]["1"]["pixels"] > zones[0.3]["1"]["pixels"]
@@ -0,0 +1,67 @@
+from src.core.registry import EngineRegistry, registry, get_bayesian_engine, get_orchestrator
+import os
+import pytest
+
+
+def test_engines_are_lazy_and_shared():
+    calls = []
+    local = EngineRegistry()
+    local.register("dummy", lambda: calls.append(1) or object())
+
+    assert local.loaded() == []
+    first = local.get("dummy")
+    assert local.get("dummy") is first
+    assert calls == [1]
+
+    with pytest.raises(KeyError):
+        local.get("missing")
+
+
+def test_orchestrator_reuses_registry_engines():
+    assert get_orchestrator().bayesian is get_bayesian_engine()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="POSIX fork required")
+def test_preloaded_engine_survives_fork():
+    registry.preload()
+    engine = get_bayesian_engine()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child: same object, no rebuild
+        ok = get_bayesian_engine() is engine and registry.loaded() == sorted(registry._factories)
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+
+
+def test_dependent_factory_on_fresh_registry_does_not_deadlock():
+    from src.sadit.inference.orchestrator import SADIT_Orchestrator
+    from src.sadit.clinical.semiology import SemiologyEngine
+
+    local = EngineRegistry()
+    local.register("semiology", SemiologyEngine)
+    local.register("orchestrator", lambda: SADIT_Orchestrator(
+        bayesian=object(), semiology=local.get("semiology")))
+
+    orchestrator = local.get("orchestrator")
+    assert orchestrator.clinical is local.get("semiology")
+
+
+def test_reset_db_pool_after_fork_disposes_without_closing(monkeypatch):
+    import sys
+    from types import SimpleNamespace
+    from src.core.registry import reset_db_pool_after_fork
+
+    calls = []
+    fake_engine = SimpleNamespace(dispose=lambda close=True: calls.append(close))
+    monkeypatch.setitem(sys.modules, "src.core.database", SimpleNamespace(engine=fake_engine))
+
+    reset_db_pool_after_fork()
+    assert calls == [False]
+
+    # No database module imported -> nothing to reset
+    monkeypatch.delitem(sys.modules, "src.core.database")
+    reset_db_pool_after_fork()
+    assert calls == [False]
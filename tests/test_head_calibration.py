@@ -0,0 +1,39 @@
+from src.sadit.vision.optimizer import VisionHeuristicOptimizer
+from src.sadit.vision.pyramid import ImagePyramid
+import cv2
+import numpy as np
+import pytest
+
+
+def make_film(radius=183, center=(1300, 700), size=2048, seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.full((size, size), 80, np.float32)
+    cv2.circle(image, center, radius, 250, -1)  # prosthetic head
+    cv2.rectangle(image, (center[0] - 50, center[1] + 150), (center[0] + 50, size - 100), 220, -1)  # stem
+    return image + rng.normal(0, 12, image.shape).astype(np.float32)
+
+
+def test_head_is_detected_coarse_to_fine():
+    optimizer = VisionHeuristicOptimizer()
+    head = optimizer.detect_prosthetic_head(make_film())
+    assert head.radius_px == pytest.approx(183, abs=2)
+    assert head.center == pytest.approx((700, 1300), abs=2)
+    assert head.confidence > 0.7
+    assert optimizer.calibrar_anatomicamente(make_film()) == pytest.approx(48.0 / 366, rel=0.02)
+
+    # Same detection from a pyramid of the film
+    from_pyramid = optimizer.detect_prosthetic_head(ImagePyramid.build(make_film(radius=150, seed=1)))
+    assert from_pyramid.radius_px == pytest.approx(150, abs=2)
+
+
+def test_calibration_is_cached_and_falls_back():
+    optimizer = VisionHeuristicOptimizer()
+    film = make_film(radius=160, seed=2)
+    first = optimizer.detect_prosthetic_head(film)
+    assert optimizer.detect_prosthetic_head(film.copy()) is first  # same content, cached
+
+    blank = optimizer.detect_prosthetic_head(np.zeros((100, 100)))
+    noise = optimizer.detect_prosthetic_head(np.random.default_rng(3).normal(80, 12, (1024, 1024)))
+    for head in (blank, noise):
+        assert head.confidence == 0.0 and head.radius_px == 120
+        assert head.pixel_spacing == pytest.approx(0.2)
@@ -0,0 +1,76 @@
+from src.core.jobs import BackgroundJobs
+from src.sadit.compliance.checker import SADIT_Compliance_Checker, SafetyException
+from src.sadit.vision.enhancement import CZTEnhancedEmulator
+from src.sadit.vision.optimizer import VisionHeuristicOptimizer
+from src.sadit.vision.pyramid import ImagePyramid
+import numpy as np
+import pytest
+import time
+
+
+@pytest.fixture(scope="module")
+def radiograph():
+    rng = np.random.default_rng(0)
+    image = (200 + rng.normal(0, 5, (1536, 1280))).astype(np.float32)
+    image[1000:1100, 300:400] += rng.normal(0, 60, (100, 100)).astype(np.float32)  # lytic patch
+    return image
+
+
+def test_pyramid_levels_and_coordinates(radiograph):
+    pyramid = ImagePyramid.build(radiograph)
+    assert pyramid.full.dtype == np.float32 and pyramid.shape == radiograph.shape
+    assert [level.shape for level in pyramid.levels[:3]] == [(1536, 1280), (768, 640), (384, 320)]
+    assert max(pyramid.levels[-1].shape) >= 128
+    assert pyramid.level_for(512) == 2
+    assert pyramid.to_full_resolution((10, 20, 30, 40), 2) == (40, 80, 120, 160)
+    assert ImagePyramid.build(pyramid) is pyramid
+
+
+def test_coarse_to_fine_gating_and_detection(radiograph):
+    pyramid = ImagePyramid.build(radiograph)
+    assert SADIT_Compliance_Checker.check_image_safety(pyramid)
+    with pytest.raises(SafetyException, match="resolution"):
+        SADIT_Compliance_Checker.check_image_safety(ImagePyramid.build(radiograph[:512]))
+    with pytest.raises(SafetyException, match="SNR"):
+        noisy = np.random.default_rng(1).normal(10, 20, (1024, 1024)).astype(np.float32)
+        SADIT_Compliance_Checker.check_image_safety(ImagePyramid.build(noisy))
+
+    texture = VisionHeuristicOptimizer().analyze_texture_pyramid(pyramid, top_k=2)
+    y0, x0, y1, x1 = texture["regions"][0]["box"]
+    assert y0 < 1100 and y1 > 1000 and x0 < 400 and x1 > 300
+    assert texture["texture_roughness"] > 25 * 10  # well above background variance
+
+
+def test_preview_and_background_job(radiograph):
+    emulator = CZTEnhancedEmulator(workers=1)
+    preview = emulator.enrich_preview(radiograph, max_side=256)
+    assert max(preview.shape) <= 256 and preview.dtype == np.float32
+
+    jobs = BackgroundJobs(workers=1, retention=1)
+    job = jobs.submit(lambda x: x * 2, 21)
+    failing = jobs.submit(lambda: 1 / 0)
+    deadline = time.time() + 5
+    while failing.status in ("pending", "running") and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.status == "done" and job.result == 42
+    assert failing.status == "error" and "ZeroDivisionError" in failing.error
+    jobs.submit(lambda: None)
+    assert jobs.get(job.job_id) is None  # pruned beyond retention
+
+
+def test_jobs_are_visible_to_other_workers(tmp_path):
+    from src.sadit.vision.cache import VisionCache
+
+    # Two workers (processes) sharing the on-disk store
+    accepting = BackgroundJobs(workers=1, store=lambda: VisionCache(str(tmp_path)))
+    polled = BackgroundJobs(workers=1, store=lambda: VisionCache(str(tmp_path)))
+    job = accepting.submit(lambda: np.full((4, 4), 0.5, np.float32))
+    scalar = accepting.submit(lambda: 42)
+    deadline = time.time() + 5
+    while polled.get(scalar.job_id).status in ("pending", "running") and time.time() < deadline:
+        time.sleep(0.01)
+    remote = polled.get(job.job_id)
+    assert remote.status == "done" and remote.finished_at == job.finished_at
+    np.testing.assert_array_equal(remote.result, job.result)
+    assert polled.get(scalar.job_id).result == 42
+    assert polled.get("0" * 32) is None
@@ -0,0 +1,63 @@
+from src.sadit.compliance.checker import SADIT_Compliance_Checker, SafetyException
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def film():
+    rng = np.random.default_rng(0)
+    image = (200 + rng.normal(0, 5, (1100, 1300))).astype(np.float32)
+    image[:20] = 255.0  # saturated band
+    return image
+
+
+def test_streaming_pass_matches_whole_image_metrics(film, tmp_path):
+    metrics = SADIT_Compliance_Checker.measure_image_quality(film, block_rows=128)
+    assert metrics.mean == pytest.approx(film.mean(dtype=np.float64), rel=1e-12)
+    assert metrics.std == pytest.approx(film.std(dtype=np.float64), rel=1e-9)
+    assert metrics.laplacian_variance == pytest.approx(
+        cv2.Laplacian(film, cv2.CV_32F).var(dtype=np.float64), rel=1e-6)
+    assert metrics.saturation_fraction == pytest.approx(20 * 1300 / film.size, rel=1e-3)
+    assert metrics.max_value == 255.0 and metrics.dynamic_range == 255.0 - film.min()
+
+    # Memory-mapped file: same result, read in blocks
+    path = tmp_path / "film.npy"
+    np.save(path, film)
+    mapped = np.load(path, mmap_mode="r")
+    assert SADIT_Compliance_Checker.measure_image_quality(mapped, block_rows=128).snr_db == \
+        pytest.approx(metrics.snr_db, rel=1e-12)
+    assert SADIT_Compliance_Checker.check_image_safety(str(path))
+
+
+def test_approximate_gate_bounds_the_exact_snr(film):
+    # Float image: no a-priori value range, so the approximate gate runs the exact pass
+    clean = film[20:]
+    exact = SADIT_Compliance_Checker.measure_image_quality(clean).snr_db
+    assert not SADIT_Compliance_Checker.measure_image_quality(clean, approximate=True).approximate
+    assert SADIT_Compliance_Checker.check_image_safety(clean, approximate=True)
+
+    # Integer image: the bound uses the dtype range and holds whatever the sample missed
+    rng = np.random.default_rng(0)
+    plate = (2000 + rng.normal(0, 20, (1100, 1100))).astype(np.uint16)
+    missed = np.setdiff1d(np.arange(1100), np.sort(np.random.default_rng(0).choice(1100, 256, replace=False)))
+    plate[missed[:40]] = 60000  # hot rows outside the seed-0 sample
+    exact = SADIT_Compliance_Checker.measure_image_quality(plate).snr_db
+    low, high = SADIT_Compliance_Checker.measure_image_quality(plate, approximate=True, seed=0).snr_bounds_db
+    assert low <= exact <= high
+    with pytest.raises(SafetyException, match="SNR"):
+        SADIT_Compliance_Checker.check_image_safety(plate, approximate=True)
+
+    # A sample covering most rows is tight enough to decide on its own
+    bright = (250 + rng.integers(-1, 2, (2000, 64))).astype(np.uint8)
+    sample = SADIT_Compliance_Checker.measure_image_quality(bright, approximate=True, sample_rows=1990)
+    low, high = sample.snr_bounds_db
+    assert sample.approximate and low <= SADIT_Compliance_Checker.measure_image_quality(bright).snr_db <= high
+    assert low >= SADIT_Compliance_Checker.MIN_SNR_THRESHOLD
+
+    # Undecided bound -> exact pass; a poor image is still rejected
+    noisy = np.random.default_rng(1).normal(50, 20, (1100, 1100)).astype(np.float32)
+    with pytest.raises(SafetyException, match="SNR"):
+        SADIT_Compliance_Checker.check_image_safety(noisy, approximate=True)
+    with pytest.raises(SafetyException, match="resolution"):
+        SADIT_Compliance_Checker.check_image_safety(clean[:500], approximate=True)
@@ -0,0 +1,34 @@
+from src.sadit.physics.load_transfer import load_transfer_model
+from src.sadit.physics.sweep import ImplantSweep, SweepSpec
+import numpy as np
+import pytest
+
+SPEC = SweepSpec(materials=("cobalt_chrome", "titanium_alloy"), stem_lengths_mm=(120.0, 140.0),
+                 stem_diameters_mm=(12.0,), bone_moduli_gpa=(8.0, 18.0))
+
+
+def test_sweep_streams_chunks_and_resumes(tmp_path):
+    sweep = ImplantSweep(str(tmp_path), SPEC, chunk_size=3)
+    assert sweep.run(max_workers=2) == 3
+    columns = sweep.load()
+    assert len(columns["material"]) == SPEC.size == 8
+
+    # Grid point (cobalt_chrome, 140 mm, 12 mm, 18 GPa) matches the cached default model
+    k = np.flatnonzero((columns["material"] == "cobalt_chrome") & (columns["stem_length_mm"] == 140.0)
+                       & (columns["bone_modulus_gpa"] == 18.0))[0]
+    assert columns["shielding_zone_1"][k] == pytest.approx(
+        load_transfer_model("cobalt_chrome").solve().gruen_shielding[1])
+    # Osteoporotic bone is shielded more by the same stem
+    soft = np.flatnonzero(columns["bone_modulus_gpa"] == 8.0)
+    assert np.all(columns["shielding_zone_1"][soft] > columns["shielding_zone_1"][soft + 1])
+
+    # Resume: only the missing chunk is recomputed
+    (tmp_path / "chunk_000001.npz").unlink()
+    assert ImplantSweep(str(tmp_path), SPEC, chunk_size=3).run(max_workers=1) == 1
+    assert np.array_equal(sweep.load()["shielding_zone_2"], columns["shielding_zone_2"])
+
+    with pytest.raises(ValueError):
+        ImplantSweep(str(tmp_path), SweepSpec(), chunk_size=3).run()
+
+    sweep.export(str(tmp_path / "sweep.npz"))
+    assert len(np.load(tmp_path / "sweep.npz")["material"]) == 8
@@ -0,0 +1,32 @@
+from src.sadit.physics.load_transfer import StemGeometry, load_transfer_model
+import numpy as np
+import pytest
+
+
+def test_load_is_shared_between_stem_and_bone():
+    model = load_transfer_model("cobalt_chrome")
+    result = model.solve(2100.0)
+    g = model.geometry
+    # Axial equilibrium in every element
+    axial = result.stem_stress_mpa * g.stem_area + result.bone_stress_mpa * g.bone_area
+    assert np.allclose(axial, 2100.0)
+    # Load fully back in the bone below the tip
+    assert result.gruen_shielding[4] == pytest.approx(0.0, abs=1e-9)
+    assert result.gruen_shielding[1] > result.gruen_shielding[2] > result.gruen_shielding[3] > 0
+    assert result.gruen_shielding[1] == result.gruen_shielding[7]
+
+
+def test_stiffer_stems_shield_more_and_factorization_is_cached():
+    cocr = load_transfer_model("cobalt_chrome")
+    assert load_transfer_model("cobalt_chrome") is cocr
+    titanium = load_transfer_model("titanium_alloy")
+    assert cocr.solve().gruen_shielding[1] > titanium.solve().gruen_shielding[1]
+
+    # Load cases solve together and scale linearly
+    light, heavy = cocr.solve_batch([700.0, 2100.0])
+    assert np.allclose(3 * light.bone_stress_mpa, heavy.bone_stress_mpa)
+    assert light.gruen_shielding == pytest.approx(heavy.gruen_shielding)
+
+    assert load_transfer_model("cobalt_chrome", geometry=StemGeometry(stem_length_mm=120.0)) is not cocr
+    with pytest.raises(ValueError):
+        load_transfer_model("unobtainium")
@@ -0,0 +1,51 @@
+from src.sadit.clinical.models import ClinicalInput, PainProfile
+from src.sadit.compliance.checker import SafetyException
+from src.sadit.inference.orchestrator import SADIT_Orchestrator
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def orchestrator():
+    return SADIT_Orchestrator()
+
+
+def make_case(location="distal", character="mechanical", ild_months=2, mobility=None):
+    pain = PainProfile(onset="gradual", location=location, intensity=6, character=character,
+                       irradiation=False)
+    return ClinicalInput(pain_profile=pain, ild_months=ild_months, mobility_assistance=mobility)
+
+
+def test_analyze_cases_matches_single_case_path(orchestrator, tmp_path):
+    rng = np.random.default_rng(0)
+    good_image = (200 + rng.normal(0, 5, (1024, 1024))).astype(np.float32)
+    image_path = str(tmp_path / "xray.npy")
+    np.save(image_path, good_image)
+
+    cases = [
+        (make_case(), "Austin Moore", good_image, "stable"),
+        (make_case("inguinal", ild_months=30, mobility="walker"), "Titanium stem", None, "loose"),
+        (make_case("diffuse", "terebrante"), "Austin Moore", np.ones((64, 64))),  # low resolution
+        (make_case(), None),  # malformed implant type
+        (make_case("inguinal"), "Titanium stem", image_path),
+    ]
+    outcomes = orchestrator.analyze_cases(cases, max_workers=2)
+
+    assert len(outcomes) == len(cases)
+    assert [o.ok for o in outcomes] == [True, True, False, False, True]
+    assert isinstance(outcomes[2].error, SafetyException)
+    assert isinstance(outcomes[3].error, AttributeError)
+
+    for outcome, case in zip(outcomes, cases):
+        if outcome.ok:
+            single = orchestrator.analyze_case(case[0], case[1], None, case[3] if len(case) > 3 else None)
+            assert outcome.result.diagnosis == single.diagnosis
+            assert outcome.result.probability == pytest.approx(single.probability)
+            assert outcome.result.confidence_interval == pytest.approx(single.confidence_interval)
+            assert outcome.result.load_transfer == single.load_transfer
+
+
+def test_analyze_cases_without_images_runs_inline(orchestrator):
+    outcomes = orchestrator.analyze_cases([(make_case(ild_months=m), "Austin Moore") for m in range(1, 40)])
+    assert all(o.ok for o in outcomes)
+    assert orchestrator.analyze_cases([]) == []
@@ -0,0 +1,39 @@
+from src.sadit.physics.assessment import PAIN_LOCATIONS, assessment_grid
+from src.sadit.physics.materials import MaterialBioMatch, MaterialProperties
+from src.sadit.physics.stress import StressCalculator
+import pytest
+
+
+def test_grid_matches_per_case_calculation():
+    grid = assessment_grid()
+    for material in MaterialBioMatch.MATERIALS:
+        for bone in ("cortical_bone", "cancellous_bone"):
+            ratio = MaterialBioMatch.calculate_stiffness_mismatch(material, bone)
+            for location in PAIN_LOCATIONS + ("unlisted",):
+                expected = StressCalculator.assess_stress_conditions(ratio, location)
+                assert dict(grid.assess(material, location, bone)) == expected
+
+    entry = grid.assess("cobalt_chrome", "distal")
+    assert entry["tip_stress_risk"] == "Critical"
+    with pytest.raises(TypeError):
+        entry["tip_stress_risk"] = "Low"  # shared entries are read-only
+    with pytest.raises(ValueError):
+        grid.assess("unobtainium", "distal")
+
+
+def test_batch_assessment_and_material_registration():
+    grid = assessment_grid()
+    batch = grid.assess_batch(["cobalt_chrome", "titanium_alloy", "cobalt_chrome"],
+                              ["distal", "distal", "inguinal"])
+    assert [a["tip_stress_risk"] for a in batch] == ["Critical", "Low", "Low"]
+    assert batch[0] is grid.assess("cobalt_chrome", "distal")
+
+    try:
+        MaterialBioMatch.register_material(
+            "porous_tantalum", MaterialProperties("Porous Ta", 3.0, 6.0, "Bobyn 1999"))
+        rebuilt = assessment_grid()
+        assert rebuilt is not grid
+        assert rebuilt.assess("porous_tantalum", "distal")["stress_shielding_risk"] == "Low"
+    finally:
+        del MaterialBioMatch.MATERIALS["porous_tantalum"]
+        MaterialBioMatch.revision += 1
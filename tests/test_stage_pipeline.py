@@ -0,0 +1,141 @@
+from src.sadit.inference.pipeline import Stage, StagePipeline
+import time
+import pytest
+
+
+def test_independent_stages_overlap_and_are_timed():
+    def slow(name):
+        return lambda c: time.sleep(0.2) or name
+
+    pipeline = StagePipeline([
+        Stage("a", slow("a")), Stage("b", slow("b")), Stage("c", slow("c")),
+        Stage("join", lambda c: c["a"] + c["b"] + c["c"] + c["suffix"], requires=("a", "b", "c")),
+    ])
+    start = time.perf_counter()
+    run = pipeline.run({"suffix": "!"})
+    elapsed = time.perf_counter() - start
+
+    assert run.outputs["join"] == "abc!"
+    assert elapsed < 0.5  # three 0.2 s stages ran concurrently
+    assert [t.name for t in run.timings] == ["a", "b", "c", "join"]
+    assert all(t.status == "ok" for t in run.timings)
+    assert run.timings[0].wall_ms >= 190 and run.timings[0].cpu_ms < 50  # sleeping is not CPU
+
+    serial = pipeline.run({"suffix": "?"}, concurrent=False)
+    assert serial.outputs["join"] == "abc?"
+
+
+def test_failed_stage_skips_dependents_only():
+    def boom(c):
+        raise ValueError("bad image")
+
+    pipeline = StagePipeline([
+        Stage("image", boom), Stage("physics", lambda c: 1),
+        Stage("report", lambda c: c["image"], requires=("image", "physics")),
+    ])
+    run = pipeline.run({})
+    statuses = {t.name: t.status for t in run.timings}
+    assert statuses == {"image": "error", "physics": "ok", "report": "skipped"}
+    assert run.outputs["physics"] == 1
+    with pytest.raises(ValueError, match="bad image"):
+        run.raise_first_error()
+
+
+def test_budget_degrades_optional_stages():
+    def slow_optional(c):
+        time.sleep(0.3)
+        return "full"
+
+    pipeline = StagePipeline([
+        Stage("required", lambda c: "ok"),
+        Stage("optional", slow_optional, optional=True, degrade=lambda c: "cheap"),
+        Stage("extra", slow_optional, optional=True),
+        Stage("join", lambda c: (c["required"], c["optional"], c["extra"]),
+              requires=("required", "optional", "extra")),
+    ])
+    # Unknown cost: stages start, then are abandoned at the deadline
+    start = time.perf_counter()
+    run = pipeline.run({}, budget_ms=50)
+    assert time.perf_counter() - start < 0.25
+    assert run.outputs["join"] == ("ok", "cheap", None)
+    assert run.degraded == ["optional", "extra"]
+    assert {t.name: t.status for t in run.timings}["extra"] == "dropped"
+
+    # Known cost (from a full run) exceeds the budget: cut before starting
+    pipeline.run({})
+    assert pipeline.expected_ms["optional"] >= 290
+    start = time.perf_counter()
+    run = pipeline.run({}, budget_ms=100, concurrent=False)
+    assert time.perf_counter() - start < 0.05
+    assert run.outputs["join"] == ("ok", "cheap", None)
+    assert pipeline.run({}, budget_ms=10_000).outputs["join"] == ("ok", "full", "full")
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        StagePipeline([Stage("a", id, requires=("b",)), Stage("b", id, requires=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        StagePipeline([Stage("a", id, requires=("missing",))])
+
+
+def test_orchestrator_attaches_stage_timings():
+    from src.sadit.clinical.models import ClinicalInput, PainProfile
+    from src.sadit.compliance.checker import SafetyException
+    from src.sadit.inference.orchestrator import SADIT_Orchestrator
+    import numpy as np
+
+    orchestrator = SADIT_Orchestrator()
+    case = ClinicalInput(pain_profile=PainProfile(onset="gradual", location="distal", intensity=6,
+                                                  character="mechanical", irradiation=False),
+                         ild_months=2, mobility_assistance=None)
+    result = orchestrator.analyze_case(case, "Austin Moore")
+    assert [t.name for t in result.stage_timings] == [
+        "image_safety", "enrichment", "texture", "physics", "load_transfer", "semiology", "bayesian",
+        "uncertainty", "synthesis"]
+    assert result.degraded_stages == []
+    assert all(t.status == "ok" and t.wall_ms >= 0 for t in result.stage_timings)
+    assert result.load_transfer["gruen_shielding"][1] > result.load_transfer["gruen_shielding"][4]
+
+    with pytest.raises(SafetyException):
+        orchestrator.analyze_case(case, "Austin Moore", image_array=np.ones((16, 16)))
+
+
+def test_orchestrator_uses_per_call_bayesian_engine():
+    from types import SimpleNamespace
+    from src.sadit.clinical.models import ClinicalInput, PainProfile
+    from src.sadit.inference.orchestrator import SADIT_Orchestrator
+
+    orchestrator = SADIT_Orchestrator(uncertainty="fixed")
+    calls = []
+    tenant = SimpleNamespace(infer_diagnosis=lambda **e: calls.append(e) or orchestrator.bayesian.infer_diagnosis(**e))
+    case = ClinicalInput(pain_profile=PainProfile(onset="gradual", location="distal", intensity=6,
+                                                  character="mechanical", irradiation=False),
+                         ild_months=None, mobility_assistance=None)
+    orchestrator.analyze_case(case, "Austin Moore", bayesian=tenant)
+    assert len(calls) == 1 and "ild_months" in calls[0]
+    orchestrator.analyze_case(case, "Austin Moore")  # default engine again
+    assert len(calls) == 1
+
+
+def test_orchestrator_latency_budget_returns_partial_result():
+    from src.sadit.clinical.models import ClinicalInput, PainProfile
+    from src.sadit.inference.orchestrator import SADIT_Orchestrator
+    import numpy as np
+
+    orchestrator = SADIT_Orchestrator()
+    case = ClinicalInput(pain_profile=PainProfile(onset="gradual", location="inguinal", intensity=6,
+                                                  character="mechanical", irradiation=False),
+                         ild_months=30, mobility_assistance="walker")
+    image = (200 + np.random.default_rng(1).normal(0, 5, (1024, 1024))).astype(np.float32)
+
+    full = orchestrator.analyze_case(case, "Titanium stem", image, image_analysis=True)
+    assert full.degraded_stages == []
+    assert full.image_findings["enriched"] and full.image_findings["texture_step"] == 1
+
+    partial = orchestrator.analyze_case(case, "Titanium stem", image, image_analysis=True,
+                                        latency_budget_ms=1)
+    assert set(partial.degraded_stages) == {"enrichment", "texture", "uncertainty"}
+    assert partial.image_findings["texture_step"] == 4 and not partial.image_findings["enriched"]
+    assert partial.diagnosis == full.diagnosis
+    assert partial.confidence_interval == pytest.approx(
+        (partial.probability - 0.05, min(1.0, partial.probability + 0.05)))
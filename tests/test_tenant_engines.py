@@ -0,0 +1,86 @@
+from src.core.tenant_engines import TenantEngineCache
+from src.sadit.inference.bayesian import SaditBayesianEngine, compile_cpd_overrides
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def base():
+    return SaditBayesianEngine()
+
+
+TRAUMA_CENTER = {"prior": [0.7, 0.2, 0.1]}
+REVISION_CLINIC = {"prior": [0.2, 0.6, 0.2],
+                   "cpds": {"Imaging": [[0.8, 0.1, 0.6], [0.2, 0.9, 0.4]]}}
+
+
+def test_tenant_overrides_compile_without_pgmpy(base):
+    compiled = compile_cpd_overrides(base.compiled, REVISION_CLINIC)
+    assert np.allclose(compiled.prior, [0.2, 0.6, 0.2])
+    assert np.allclose(compiled.likelihoods["Imaging"][:-1], REVISION_CLINIC["cpds"]["Imaging"])
+    assert np.array_equal(compiled.likelihoods["Location"], base.compiled.likelihoods["Location"])
+
+    engine = SaditBayesianEngine.from_compiled(compiled)
+    assert engine.infer_diagnosis().scenario_b_prob == pytest.approx(0.6)
+
+    with pytest.raises(ValueError):
+        compile_cpd_overrides(base.compiled, {"prior": [0.5, 0.5, 0.5]})
+    with pytest.raises(ValueError):
+        compile_cpd_overrides(base.compiled, {"cpds": {"Imaging": [[0.5, 0.5, 0.5]]}})
+    with pytest.raises(ValueError):
+        compile_cpd_overrides(base.compiled, {"cpds": {"Fever": [[1.0, 1.0, 1.0]]}})
+
+
+def test_cache_is_lru_with_memory_accounting(base):
+    specs = {1: TRAUMA_CENTER, 2: REVISION_CLINIC, 3: TRAUMA_CENTER, 4: None}
+    loads = []
+
+    def load_spec(tenant_id):
+        loads.append(tenant_id)
+        return specs[tenant_id]
+
+    cache = TenantEngineCache(max_entries=2, max_bytes=10 ** 9, ttl=3600)
+    trauma = cache.get(1, load_spec, base)
+    assert cache.get(1, load_spec, base) is trauma
+    assert trauma.infer_diagnosis().scenario_a_prob == pytest.approx(0.7)
+    assert cache.nbytes == trauma.nbytes
+
+    cache.get(2, load_spec, base)
+    cache.get(1, load_spec, base)  # 1 is now most recently used
+    cache.get(3, load_spec, base)  # evicts 2
+    assert cache.stats()["evictions"] == 1
+    cache.get(1, load_spec, base)
+    assert loads == [1, 2, 3]
+
+    # No variant: the shared engine, cached at zero cost
+    assert cache.get(4, load_spec, base) is base
+    assert cache.get(4, load_spec, base) is base
+    assert loads.count(4) == 1
+
+    # Byte budget: only one compiled variant fits
+    small = TenantEngineCache(max_entries=10, max_bytes=trauma.nbytes + 1, ttl=3600)
+    small.get(1, load_spec, base)
+    small.get(2, load_spec, base)
+    assert small.stats()["tenants"] == 1 and small.nbytes <= trauma.nbytes + 1
+
+
+def test_cache_revalidates_definitions_after_ttl(base):
+    specs = {7: TRAUMA_CENTER}
+    cache = TenantEngineCache(ttl=0)
+    first = cache.get(7, specs.get, base)
+    assert cache.get(7, specs.get, base) is first  # unchanged definition: reused
+
+    specs[7] = REVISION_CLINIC
+    updated = cache.get(7, specs.get, base)
+    assert updated is not first
+    assert updated.infer_diagnosis().scenario_b_prob == pytest.approx(0.6)
+
+
+def test_tenant_id_is_read_from_the_jwt():
+    from jose import JWTError
+    from src.core.security import create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "doc@hospital.org", "tenant_id": 12})
+    assert decode_access_token(token)["tenant_id"] == 12
+    with pytest.raises(JWTError):
+        decode_access_token(token + "tampered")
@@ -0,0 +1,61 @@
+from src.sadit.vision.optimizer import VisionHeuristicOptimizer
+from src.sadit.vision.texture import TextureMapEngine
+from scipy.ndimage import generic_filter
+import cv2
+import numpy as np
+import pytest
+
+
+def make_hip(lesion=True, seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.full((2048, 2048), 80, np.float32)
+    cv2.circle(image, (1000, 700), 150, 250, -1)  # head, medial of the stem
+    cv2.line(image, (1000, 700), (1300, 950), 235, 70)  # neck
+    cv2.rectangle(image, (1250, 900), (1350, 1900), 220, -1)  # stem
+    image += rng.normal(0, 4, image.shape).astype(np.float32)
+    if lesion:
+        # Heterogeneous bone beside the stem: lateral, proximal third
+        image[1000:1200, 1360:1420] += rng.normal(0, 40, (200, 60)).astype(np.float32)
+    return image
+
+
+def test_maps_match_brute_force_windows():
+    image = np.random.default_rng(0).uniform(0, 1, (12, 13)).astype(np.float32)
+    norm = ((image - image.min()) / (image.max() - image.min())).astype(np.float64)
+    maps = TextureMapEngine(window=5, bins=4).compute(image)
+
+    def entropy(values):
+        values = values[~np.isnan(values)]
+        p = np.bincount(np.minimum(values * 4, 3).astype(int), minlength=4) / len(values)
+        return -(p[p > 0] * np.log2(p[p > 0])).sum()
+
+    # Border windows are clipped to the image
+    window = dict(size=5, mode="constant", cval=np.nan)
+    np.testing.assert_allclose(maps.entropy, generic_filter(norm, entropy, **window), atol=1e-5)
+    np.testing.assert_allclose(maps.variance, generic_filter(norm, lambda v: np.var(v[~np.isnan(v)]), **window),
+                               atol=1e-6)
+    assert maps.osteolysis().max() <= 1.0
+
+
+def test_lesion_is_located_in_its_gruen_zone():
+    result = VisionHeuristicOptimizer().analyze_gruen_zones(make_hip())
+    stem = result["stem"]
+    assert stem["direction"][0] > 0.9  # proximal -> distal, downwards
+    assert stem["origin"][0] + stem["length_px"] == pytest.approx(1900, abs=15)  # tip
+    zones = result["zones"]
+    assert all(zones[z]["pixels"] > 0 for z in "1234567")
+    assert max(zones, key=lambda z: zones[z]["osteolysis"]) == "1"
+    assert zones["1"]["variance"] > 5 * zones["7"]["variance"]
+
+
+def test_no_stem_gives_no_zones():
+    result = VisionHeuristicOptimizer().analyze_gruen_zones(np.zeros((512, 512), np.float32))
+    assert result["stem"] is None and result["zones"] == {}
+
+
+def test_no_head_gives_no_zones():
+    # A bright vertical band without a prosthetic head must not be read as a stem
+    image = (80 + np.random.default_rng(0).normal(0, 10, (1024, 1024))).astype(np.float32)
+    image[:, 450:560] = 230
+    result = VisionHeuristicOptimizer().analyze_gruen_zones(image)
+    assert result["stem"] is None and result["zones"] == {}
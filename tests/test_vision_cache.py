@@ -0,0 +1,49 @@
+from src.sadit.vision.cache import VisionCache, content_hash
+from src.sadit.vision.enhancement import CZTEnhancedEmulator
+from src.sadit.vision.optimizer import VisionHeuristicOptimizer
+import os
+import time
+import numpy as np
+
+
+def test_repeat_enrichment_is_served_from_disk(tmp_path):
+    rng = np.random.default_rng(0)
+    image = rng.uniform(0.2, 0.8, (96, 96)).astype(np.float32)
+    emulator = CZTEnhancedEmulator(workers=1, cache=VisionCache(str(tmp_path)))
+    first = emulator.enrich_image(image)
+
+    # A new emulator (another worker process) finds the entry on disk
+    other = CZTEnhancedEmulator(workers=1, cache=VisionCache(str(tmp_path)))
+    start = time.perf_counter()
+    again = other.enrich_image(image)
+    assert time.perf_counter() - start < 0.05
+    assert other.cache.hits == 1
+    np.testing.assert_array_equal(again, first)
+
+    # Different parameters -> different key
+    other.CLAHE_CLIP_LIMIT = 0.02
+    other.enrich_image(image)
+    assert other.cache.misses == 1
+
+
+def test_features_are_cached_as_json(tmp_path):
+    cache = VisionCache(str(tmp_path))
+    image = np.zeros((300, 300), np.float32)
+    head = VisionHeuristicOptimizer(cache=cache).detect_prosthetic_head(image)
+    key = content_hash(image, "prosthetic_head", "1", VisionHeuristicOptimizer()._detection_parameters())
+    assert cache.get_json(key)["radius_px"] == head.radius_px
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = VisionCache(str(tmp_path), max_bytes=10_000)
+    arrays = {f"{i:02d}" * 32: np.full(1000, i, np.float32) for i in range(4)}  # ~4.1 KB each
+    for n, (key, array) in enumerate(arrays.items()):
+        cache.put_array(key, array)
+        os.utime(cache._path(key, ".npy"), (n, n))
+        if n == 1:
+            cache.get_array("00" * 32)  # touched: now more recent than entry 1
+    assert cache.nbytes <= 10_000
+    assert cache.get_array("01" * 32) is None
+    assert cache.get_array("03" * 32)[0] == 3
+    assert not [name for shard in os.listdir(tmp_path) if shard != ".lock"
+                for name in os.listdir(tmp_path / shard) if name.startswith(".tmp-")]